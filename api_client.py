@@ -1,61 +1,184 @@
 import time
+import hashlib
 import requests
-from typing import Dict, List, Optional, Any
+from concurrent.futures import Future
+from threading import Lock
+from typing import Dict, List, Optional, Any, Tuple
+from metrics import Metrics
 from rate_limiter import RateLimiter
+from response_cache import ResponseCache
+
+
+class FlightAborted(Exception):
+    pass
 
 
 class KeysAPIClient:
     BASE_URL = "https://api.keys.so"
+    MAX_PER_PAGE = 1000
+    CACHEABLE_ENDPOINTS = (
+        "/tools/suggest",
+        "/tools/extended_keywords",
+        "/tools/delete_double",
+        "/report/simple/keyword_dashboard"
+    )
+    # Минимальное суммарное ожидание ответов 202 за один запрос, сек
+    ACCEPTED_WAIT = 6.0
     
-    def __init__(self, api_token: str):
+    def __init__(self, api_token: str, cache: Optional[ResponseCache] = None,
+                 rate_limiter: Optional[RateLimiter] = None, base_url: Optional[str] = None,
+                 metrics: Optional[Metrics] = None, accepted_wait: float = ACCEPTED_WAIT):
         self.api_token = api_token
-        self.rate_limiter = RateLimiter(max_requests=10, time_window=10)
+        self.accepted_wait = accepted_wait
+        self.base_url = (base_url or self.BASE_URL).rstrip("/")
+        # Ответы разных серверов и токенов не должны подменять друг друга в общем кеше
+        self.cache_scope = f"{self.base_url}|{hashlib.sha256(api_token.encode('utf-8')).hexdigest()[:16]}"
+        self.cache = cache
+        self.metrics = metrics or Metrics()
+        self.coalesced = 0
+        self._flights: Dict[str, Future] = {}
+        self._flights_lock = Lock()
+        self.rate_limiter = rate_limiter or RateLimiter(max_requests=10, time_window=10)
         self.session = requests.Session()
         self.session.headers.update({
             "X-Keyso-TOKEN": api_token,
             "Content-Type": "application/json"
         })
 
-    def _request(self, method: str, endpoint: str, max_retries: int = 3, **kwargs) -> Dict:
+    def _cache_key(self, method: str, endpoint: str, kwargs: Dict) -> Optional[str]:
+        if self.cache is None or "/state/" in endpoint:
+            return None
+        if not endpoint.startswith(self.CACHEABLE_ENDPOINTS):
+            return None
+        return ResponseCache.make_key(method, endpoint, kwargs.get("params"), kwargs.get("json"),
+                                      scope=self.cache_scope)
+
+    def _send(self, method: str, endpoint: str, **kwargs) -> requests.Response:
+        url = f"{self.base_url}{endpoint}"
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except requests.exceptions.RequestException:
+            self.metrics.observe_request(endpoint, "error", time.perf_counter() - start, 0)
+            raise
+        self.metrics.observe_request(endpoint, response.status_code, time.perf_counter() - start,
+                                     len(response.content))
+        return response
+
+    def _lookup_cache(self, endpoint: str, cache_key: Optional[str], use_cache: bool) -> Optional[Any]:
+        if not cache_key or not use_cache:
+            return None
+        cached = self.cache.get(cache_key)
+        self.metrics.observe_cache(endpoint, cached is not None)
+        return cached
+
+    def _flight_key(self, method: str, endpoint: str, use_cache: bool, kwargs: Dict) -> str:
+        key = ResponseCache.make_key(method, endpoint, kwargs.get("params"), kwargs.get("json"))
+        return key if use_cache else f"{key}:fresh"
+
+    def _join_flight(self, key: str, endpoint: str) -> Tuple[Future, bool]:
+        with self._flights_lock:
+            future = self._flights.get(key)
+            if future is not None:
+                self.coalesced += 1
+                self.metrics.observe_coalesced(endpoint)
+                return future, False
+            future = self._flights[key] = Future()
+            return future, True
+
+    def _land_flight(self, key: str, future: Future, result: Any = None,
+                     error: Optional[BaseException] = None):
+        with self._flights_lock:
+            self._flights.pop(key, None)
+        if future.done():
+            return
+        if error is None:
+            future.set_result(result)
+        elif isinstance(error, Exception):
+            future.set_exception(error)
+        else:
+            future.set_exception(FlightAborted())
+
+    def _handle_response(self, response: requests.Response, attempt: int,
+                         max_retries: int, endpoint: str = "") -> Tuple[bool, Any, float]:
+        if response.status_code == 429:
+            retry_after = int(response.headers.get("Retry-After", 15))
+            print(f"⏳ Превышен лимит запросов. Ожидание {retry_after} сек...")
+            self.rate_limiter.on_throttled(retry_after)
+            return False, None, 0
+        
+        self.rate_limiter.on_success()
+        
+        if response.status_code == 202:
+            if attempt >= max_retries - 1:
+                return False, None, 0
+            # Паузы растут до 2 сек, но вместе дают не меньше accepted_wait
+            delay = max(min(2, 0.5 * 2 ** attempt), self.accepted_wait / (max_retries - 1))
+            self.metrics.observe_accepted(endpoint, delay)
+            return False, None, delay
+        
+        if response.status_code == 401:
+            raise Exception("❌ Неверный или просроченный токен API")
+        
+        if response.status_code == 404:
+            return True, None, 0
+        
+        if response.status_code == 500:
+            if attempt < max_retries - 1:
+                wait_time = 2 ** attempt
+                print(f"⚠️ Ошибка сервера. Повтор через {wait_time} сек...")
+                return False, None, wait_time
+            raise Exception("❌ Ошибка сервера после нескольких попыток")
+        
+        response.raise_for_status()
+        return True, response.json(), 0
+
+    def _request(self, method: str, endpoint: str, max_retries: int = 3,
+                 use_cache: bool = True, **kwargs) -> Dict:
+        cache_key = self._cache_key(method, endpoint, kwargs)
+        cached = self._lookup_cache(endpoint, cache_key, use_cache)
+        if cached is not None:
+            return cached
+        
+        flight_key = self._flight_key(method, endpoint, use_cache, kwargs)
+        while True:
+            future, leader = self._join_flight(flight_key, endpoint)
+            if leader:
+                break
+            try:
+                return future.result()
+            except FlightAborted:
+                continue
+        
+        try:
+            result = self._fetch(method, endpoint, cache_key, max_retries, **kwargs)
+        except BaseException as e:
+            self._land_flight(flight_key, future, error=e)
+            raise
+        self._land_flight(flight_key, future, result)
+        return result
+
+    def _fetch(self, method: str, endpoint: str, cache_key: Optional[str],
+               max_retries: int, **kwargs) -> Optional[Dict]:
         for attempt in range(max_retries):
+            if attempt:
+                self.metrics.observe_retry(endpoint)
             try:
-                self.rate_limiter.wait_if_needed()
-                
-                url = f"{self.BASE_URL}{endpoint}"
-                response = self.session.request(method, url, **kwargs)
-                
-                if response.status_code == 202:
-                    time.sleep(2)
-                    continue
-                
-                if response.status_code == 429:
-                    retry_after = int(response.headers.get("Retry-After", 15))
-                    print(f"⏳ Превышен лимит запросов. Ожидание {retry_after} сек...")
-                    time.sleep(retry_after)
-                    continue
-                
-                if response.status_code == 401:
-                    raise Exception("❌ Неверный или просроченный токен API")
-                
-                if response.status_code == 404:
-                    return None
-                
-                if response.status_code == 500:
-                    if attempt < max_retries - 1:
-                        wait_time = 2 ** attempt
-                        print(f"⚠️ Ошибка сервера. Повтор через {wait_time} сек...")
-                        time.sleep(wait_time)
-                        continue
-                    raise Exception("❌ Ошибка сервера после нескольких попыток")
-                
-                response.raise_for_status()
-                return response.json()
-                
+                self.metrics.observe_rate_limit(self.rate_limiter.acquire())
+                response = self._send(method, endpoint, **kwargs)
+                done, result, delay = self._handle_response(response, attempt, max_retries, endpoint)
             except requests.exceptions.RequestException as e:
                 if attempt < max_retries - 1:
                     time.sleep(2 ** attempt)
                     continue
                 raise Exception(f"❌ Ошибка запроса: {str(e)}")
+            
+            if done:
+                if cache_key and result is not None:
+                    self.cache.set(cache_key, endpoint, result)
+                return result
+            if delay:
+                time.sleep(delay)
         
         return None
 
@@ -73,20 +196,31 @@ class KeysAPIClient:
         if not self.api_token:
             return {}
         results = {}
+        errors = []
         for region in regions:
             print(f"   🌍 Обработка региона {region}...")
-            suggested = self.suggest(keywords, region)
+            try:
+                suggested = self.suggest(keywords, region)
+            except Exception as e:
+                print(f"   ⚠ Регион {region}: {e}")
+                errors.append(e)
+                continue
             if suggested:
                 results[region] = suggested
+        
+        if errors and len(errors) == len(regions):
+            raise errors[0]
         return results
 
     def create_extended_keywords(self, base: str, keywords: List[str], 
                                  similarity: int = 30, 
                                  delete_duplicate: bool = True,
-                                 additions: bool = True) -> Optional[str]:
+                                 additions: bool = True,
+                                 use_cache: bool = True) -> Optional[str]:
         response = self._request(
             "POST",
             "/tools/extended_keywords",
+            use_cache=use_cache,
             json={
                 "base": base,
                 "list": keywords,
@@ -103,6 +237,9 @@ class KeysAPIClient:
         response = self._request("GET", f"/tools/extended_keywords/state/{uid}")
         return response if response else {"state": 0, "progress": 0}
 
+    def extended_keywords_exists(self, uid: str) -> bool:
+        return self._request("GET", f"/tools/extended_keywords/state/{uid}") is not None
+
     def get_extended_keywords(self, uid: str, page: int = 1, per_page: int = 100, 
                              filters: str = "", sort: str = "wsk|asc") -> Dict:
         params = {
@@ -120,21 +257,6 @@ class KeysAPIClient:
         )
         return response if response else {"data": [], "total": 0}
 
-    def wait_for_extended_keywords(self, uid: str, max_wait: int = 60) -> bool:
-        start_time = time.time()
-        while time.time() - start_time < max_wait:
-            state = self.check_extended_keywords_state(uid)
-            if state.get("state") == 10:
-                return True
-            if state.get("state") == 2:
-                raise Exception("❌ Ошибка обработки отчета")
-            
-            progress = state.get("progress", 0)
-            print(f"⏳ Обработка: {progress}%")
-            time.sleep(3)
-        
-        raise Exception("❌ Превышено время ожидания отчета")
-
     def delete_doubles(self, keywords: List[str]) -> List[str]:
         response = self._request(
             "POST",
@@ -143,6 +265,25 @@ class KeysAPIClient:
         )
         return response.get("keys", []) if response else keywords
 
+    def create_keywords_by_list(self, base: str, keywords: List[str],
+                                use_cache: bool = True) -> Optional[str]:
+        response = self._request(
+            "POST",
+            "/tools/keywords_by_list",
+            use_cache=use_cache,
+            json={"base": base, "list": keywords}
+        )
+        return response.get("uid") if response else None
+
+    def get_keywords_by_list(self, uid: str, base: str, page: int = 1, per_page: int = 100,
+                             sort: str = "wsk|desc", max_retries: int = 3) -> Optional[Dict]:
+        return self._request(
+            "GET",
+            f"/tools/keywords_by_list/{uid}",
+            max_retries=max_retries,
+            params={"base": base, "page": page, "per_page": per_page, "sort": sort}
+        )
+
     def get_keyword_dashboard(self, base: str, keyword: str) -> Optional[Dict]:
         response = self._request(
             "GET",
@@ -0,0 +1,227 @@
+import asyncio
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Dict, List, Optional
+from requests.adapters import HTTPAdapter
+from api_client import FlightAborted, KeysAPIClient
+from job_poller import JobPoller
+
+
+class AsyncKeysAPIClient:
+    def __init__(self, client: KeysAPIClient, max_concurrency: int = 4,
+                 poller: Optional[JobPoller] = None):
+        self.client = client
+        self.poller = poller or JobPoller()
+        self.api_token = client.api_token
+        self.max_concurrency = max(1, max_concurrency)
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency,
+            thread_name_prefix="keys-api"
+        )
+        self._loop = None
+        self._semaphore = None
+
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_concurrency)
+        client.session.mount("https://", adapter)
+        client.session.mount("http://", adapter)
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def _request(self, method: str, endpoint: str, max_retries: int = 3,
+                       use_cache: bool = True, **kwargs) -> Dict:
+        cache_key = self.client._cache_key(method, endpoint, kwargs)
+        cached = self.client._lookup_cache(endpoint, cache_key, use_cache)
+        if cached is not None:
+            return cached
+
+        flight_key = self.client._flight_key(method, endpoint, use_cache, kwargs)
+        while True:
+            future, leader = self.client._join_flight(flight_key, endpoint)
+            if leader:
+                break
+            try:
+                return await asyncio.shield(asyncio.wrap_future(future))
+            except FlightAborted:
+                continue
+
+        try:
+            result = await self._fetch(method, endpoint, cache_key, max_retries, **kwargs)
+        except BaseException as e:
+            self.client._land_flight(flight_key, future, error=e)
+            raise
+        self.client._land_flight(flight_key, future, result)
+        return result
+
+    async def _fetch(self, method: str, endpoint: str, cache_key: Optional[str],
+                     max_retries: int, **kwargs) -> Optional[Dict]:
+        metrics = self.client.metrics
+        loop = asyncio.get_running_loop()
+        for attempt in range(max_retries):
+            if attempt:
+                metrics.observe_retry(endpoint)
+            try:
+                async with self._get_semaphore():
+                    metrics.observe_rate_limit(await self.client.rate_limiter.acquire_async())
+                    response = await loop.run_in_executor(
+                        self.executor,
+                        partial(self.client._send, method, endpoint, **kwargs)
+                    )
+                done, result, delay = self.client._handle_response(response, attempt, max_retries, endpoint)
+            except requests.exceptions.RequestException as e:
+                if attempt < max_retries - 1:
+                    await asyncio.sleep(2 ** attempt)
+                    continue
+                raise Exception(f"❌ Ошибка запроса: {str(e)}")
+
+            if done:
+                if cache_key and result is not None:
+                    self.client.cache.set(cache_key, endpoint, result)
+                return result
+            if delay:
+                await asyncio.sleep(delay)
+
+        return None
+
+    async def suggest(self, keywords: List[str], region: int) -> List[str]:
+        if not self.api_token:
+            return []
+        response = await self._request(
+            "POST",
+            "/tools/suggest",
+            json={"list": keywords, "region": region}
+        )
+        return response.get("keys", []) if response else []
+
+    async def suggest_multi_region(self, keywords: List[str], regions: List[int]) -> Dict[int, List[str]]:
+        if not self.api_token:
+            return {}
+        async def fetch(region: int):
+            try:
+                return region, await self.suggest(keywords, region), None
+            except Exception as e:
+                return region, [], e
+
+        results = {}
+        errors = []
+        for future in asyncio.as_completed([fetch(region) for region in regions]):
+            region, suggested, error = await future
+            if error is not None:
+                print(f"   ⚠ Регион {region}: {error}")
+                errors.append(error)
+                continue
+            if suggested:
+                results[region] = suggested
+
+        if errors and len(errors) == len(regions):
+            raise errors[0]
+        return results
+
+    async def create_extended_keywords(self, base: str, keywords: List[str],
+                                       similarity: int = 30,
+                                       delete_duplicate: bool = True,
+                                       additions: bool = True,
+                                       use_cache: bool = True) -> Optional[str]:
+        response = await self._request(
+            "POST",
+            "/tools/extended_keywords",
+            use_cache=use_cache,
+            json={
+                "base": base,
+                "list": keywords,
+                "config": {
+                    "similarity": similarity,
+                    "deleteDuplicate": delete_duplicate,
+                    "additions": additions
+                }
+            }
+        )
+        return response.get("uid") if response else None
+
+    async def check_extended_keywords_state(self, uid: str) -> Dict:
+        response = await self._request("GET", f"/tools/extended_keywords/state/{uid}")
+        return response if response else {"state": 0, "progress": 0}
+
+    async def extended_keywords_exists(self, uid: str) -> bool:
+        return await self._request("GET", f"/tools/extended_keywords/state/{uid}") is not None
+
+    async def get_extended_keywords(self, uid: str, page: int = 1, per_page: int = 100,
+                                    filters: str = "", sort: str = "wsk|asc") -> Dict:
+        params = {
+            "page": page,
+            "per_page": per_page,
+            "sort": sort
+        }
+        if filters:
+            params["filter"] = filters
+
+        response = await self._request(
+            "GET",
+            f"/tools/extended_keywords/{uid}",
+            params=params
+        )
+        return response if response else {"data": [], "total": 0}
+
+    async def check_job_state(self, tool: str, uid: str) -> Dict:
+        response = await self._request("GET", f"/tools/{tool}/state/{uid}")
+        return response if response else {"state": 0, "progress": 0}
+
+    async def wait_for_job(self, tool: str, uid: str, max_wait: Optional[float] = None) -> Dict:
+        return await self.poller.wait(uid, partial(self.check_job_state, tool, uid), max_wait)
+
+    async def wait_for_extended_keywords(self, uid: str, max_wait: Optional[float] = None) -> bool:
+        await self.wait_for_job("extended_keywords", uid, max_wait)
+        return True
+
+    async def delete_doubles(self, keywords: List[str]) -> List[str]:
+        response = await self._request(
+            "POST",
+            "/tools/delete_double",
+            json={"list": keywords}
+        )
+        return response.get("keys", []) if response else keywords
+
+    async def create_keywords_by_list(self, base: str, keywords: List[str],
+                                      use_cache: bool = True) -> Optional[str]:
+        response = await self._request(
+            "POST",
+            "/tools/keywords_by_list",
+            use_cache=use_cache,
+            json={"base": base, "list": keywords}
+        )
+        return response.get("uid") if response else None
+
+    async def get_keywords_by_list(self, uid: str, base: str, page: int = 1, per_page: int = 100,
+                                   sort: str = "wsk|desc", max_retries: int = 3) -> Optional[Dict]:
+        return await self._request(
+            "GET",
+            f"/tools/keywords_by_list/{uid}",
+            max_retries=max_retries,
+            params={"base": base, "page": page, "per_page": per_page, "sort": sort}
+        )
+
+    async def wait_for_keywords_by_list(self, uid: str, base: str, per_page: int = 100,
+                                        max_wait: Optional[float] = None) -> Optional[Dict]:
+        # У keywords_by_list нет эндпоинта состояния: пока результат не готов, первая страница отвечает 202
+        async def probe() -> Dict:
+            page = await self.get_keywords_by_list(uid, base, page=1, per_page=per_page, max_retries=1)
+            return {"state": 10, "page": page} if page else {"state": 0, "progress": 0}
+
+        state = await self.poller.wait(uid, probe, max_wait)
+        return state["page"]
+
+    async def get_keyword_dashboard(self, base: str, keyword: str) -> Optional[Dict]:
+        response = await self._request(
+            "GET",
+            "/report/simple/keyword_dashboard",
+            params={"base": base, "keyword": keyword}
+        )
+        return response
+
+    def close(self):
+        self.executor.shutdown(wait=False)
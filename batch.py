@@ -0,0 +1,184 @@
+import os
+import re
+import csv
+import json
+import time
+import asyncio
+from dataclasses import replace
+from typing import Dict, List, Optional
+from api_client import KeysAPIClient
+from async_api_client import AsyncKeysAPIClient
+from job_poller import JobPoller
+from rate_limiter import RateLimiter
+from seed_generator import SeedGenerator
+from seed_store import SeedStore
+from keyword_processor import KeywordProcessor
+from keyword_record import KeywordRecord
+from ranking import StatsAccumulator, top_k
+from exporter import Exporter
+
+
+MANIFEST_FIELDS = {
+    "niche": ("niche", str),
+    "base": ("base", str),
+    "region": ("region_id", int),
+    "wsk": ("wsk_threshold", int),
+    "ws": ("ws_threshold", int),
+    "words": ("min_num_words", int),
+    "max_results": ("max_results", int),
+    "top": ("return_top", int),
+    "seeds": ("seed_count", int),
+    "ad_filters": ("ad_filters", str)
+}
+
+
+def _split(value) -> List[str]:
+    if isinstance(value, list):
+        return [str(item).strip() for item in value if str(item).strip()]
+    return [item.strip() for item in str(value).split(",") if item.strip()]
+
+
+def load_manifest(path: str) -> List[Dict]:
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            rows = [json.loads(line) for line in f if line.strip()]
+        else:
+            rows = list(csv.DictReader(f))
+
+    for line, row in enumerate(rows, 1):
+        if not str(row.get("niche") or "").strip():
+            raise Exception(f"❌ Манифест {path}: в строке {line} не указана ниша")
+    return rows
+
+
+def niche_config(base_config, row: Dict):
+    # Строка с одним регионом отменяет MULTI_REGION из окружения
+    if row.get("region") not in (None, ""):
+        config = replace(base_config, multi_region=False)
+    else:
+        config = replace(base_config)
+    for key, value in row.items():
+        if value is None or value == "":
+            continue
+        if key in MANIFEST_FIELDS:
+            field, cast = MANIFEST_FIELDS[key]
+            setattr(config, field, cast(value))
+        elif key == "regions":
+            config.regions = [int(region) for region in _split(value)]
+            config.multi_region = len(config.regions) > 1
+            if not config.multi_region:
+                config.region_id = config.regions[0]
+        elif key == "minus":
+            config.stop_words = _split(value)
+    return config
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^\w]+", "_", text.lower()).strip("_")[:40] or "niche"
+
+
+class BatchRunner:
+    def __init__(self, api_client: KeysAPIClient, config, out_dir: str,
+                 export_format: str = "both", parallel: int = 4,
+                 seed_store: Optional[SeedStore] = None):
+        self.api = api_client
+        self.seed_store = seed_store
+        self.config = config
+        self.out_dir = out_dir
+        self.export_format = export_format
+        self.parallel = max(1, parallel)
+        self.async_api = AsyncKeysAPIClient(
+            api_client,
+            max_concurrency=config.max_concurrency,
+            poller=JobPoller(RateLimiter(max_requests=config.poll_budget, time_window=10))
+        )
+
+    def run(self, rows: List[Dict]) -> List[Dict]:
+        try:
+            return asyncio.run(self.run_async(rows))
+        finally:
+            self.async_api.close()
+
+    async def run_async(self, rows: List[Dict]) -> List[Dict]:
+        os.makedirs(self.out_dir, exist_ok=True)
+        semaphore = asyncio.Semaphore(self.parallel)
+        started = time.monotonic()
+
+        results = await asyncio.gather(*(
+            self._run_niche(index, row, semaphore) for index, row in enumerate(rows, 1)
+        ))
+
+        summary = self._summary(results, time.monotonic() - started)
+        with open(os.path.join(self.out_dir, "summary.json"), "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        self._print_summary(summary)
+        return results
+
+    async def _run_niche(self, index: int, row: Dict, semaphore: asyncio.Semaphore) -> Dict:
+        async with semaphore:
+            config = niche_config(self.config, row)
+            result = {"index": index, "niche": config.niche, "base": config.base, "rows": 0}
+            started = time.monotonic()
+            print(f"\n🚀 [{index}] {config.niche}")
+
+            try:
+                config.validate()
+                seeds = SeedGenerator.from_config(config).generate(count=config.seed_count)
+                processor = KeywordProcessor(self.api, config, async_client=self.async_api,
+                                             seed_store=self.seed_store)
+                keywords = await processor.process_pipeline_async(seeds)
+                directory = os.path.join(self.out_dir, f"{index:03d}_{_slug(config.niche)}")
+                if keywords:
+                    loop = asyncio.get_running_loop()
+                    await loop.run_in_executor(None, self._export, keywords, seeds, config, directory)
+                result.update(status="ok", rows=len(keywords), directory=directory)
+            except Exception as e:
+                print(f"\n❌ [{index}] {config.niche}: {e}")
+                result.update(status="error", error=str(e))
+
+            result["seconds"] = round(time.monotonic() - started, 2)
+            return result
+
+    def _export(self, keywords: List[KeywordRecord], seeds: List[str], config, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        base_filename = os.path.join(directory, "keywords")
+        for writer in Exporter.open_writers(base_filename, self.export_format, compress=config.export_gzip):
+            with writer:
+                writer.write_all(keywords)
+
+        stats = StatsAccumulator(config.stop_words)
+        stats.add(keywords)
+        report = Exporter.generate_report(top_k(keywords, config.return_top), seeds, config, stats=stats)
+        with open(os.path.join(directory, "report.txt"), "w", encoding="utf-8") as f:
+            f.write(report)
+
+    def _summary(self, results: List[Dict], elapsed: float) -> Dict:
+        done = [result for result in results if result["status"] == "ok"]
+        rows = sum(result["rows"] for result in done)
+        busy = sum(result["seconds"] for result in results)
+        return {
+            "niches": len(results),
+            "ok": len(done),
+            "failed": len(results) - len(done),
+            "rows": rows,
+            "seconds": round(elapsed, 2),
+            "rows_per_second": round(rows / elapsed, 1) if elapsed else 0,
+            "niches_per_hour": round(len(done) * 3600 / elapsed, 1) if elapsed else 0,
+            "overlap": round(busy / elapsed, 2) if elapsed else 0,
+            "polls": self.async_api.poller.polls,
+            "results": results
+        }
+
+    def _print_summary(self, summary: Dict):
+        print("\n" + "=" * 80)
+        print("📦 ИТОГИ ПАКЕТА")
+        print("=" * 80)
+        for result in summary["results"]:
+            mark = "✓" if result["status"] == "ok" else "✗"
+            detail = f"{result['rows']} ключей" if result["status"] == "ok" else result["error"]
+            print(f"   {mark} [{result['index']}] {result['niche']}: {detail} · {result['seconds']} сек")
+        print(f"\nНиш: {summary['ok']}/{summary['niches']} · ключей: {summary['rows']} · "
+              f"время: {summary['seconds']} сек")
+        print(f"Скорость: {summary['rows_per_second']} ключей/сек · {summary['niches_per_hour']} ниш/час · "
+              f"параллельность: x{summary['overlap']} · опросов статуса: {summary['polls']}")
+        print(f"💾 Сводка сохранена: {os.path.join(self.out_dir, 'summary.json')}")
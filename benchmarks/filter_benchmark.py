@@ -0,0 +1,103 @@
+import re
+import sys
+import time
+import random
+import argparse
+from typing import Dict, List
+from types import SimpleNamespace
+from keyword_filter import FilterExpression, KeywordFilter
+from keyword_record import KeywordRecord
+
+
+STOP_WORDS = ["бесплатно", "видео", "скачать", "реферат", "вакансии", "картинки", "фото", "смотреть"]
+WORDS = [
+    "купить", "заказать", "доставка", "цветы", "букет", "москва", "недорого", "срочно",
+    "розы", "пионы", "премиум", "круглосуточно", "с", "на", "дом", "офис", "цена"
+]
+
+
+def generate_rows(count: int, seed: int = 42) -> List[Dict]:
+    rng = random.Random(seed)
+    extra = STOP_WORDS + ["!", "купить"]
+    rows = []
+    for i in range(count):
+        words = rng.sample(WORDS, rng.randint(2, 6))
+        if rng.random() < 0.1:
+            words.append(rng.choice(extra))
+        rows.append({
+            "destination_key": " ".join(words),
+            "wsk": rng.randint(0, 200),
+            "ws": rng.randint(0, 5000),
+            "numwords": len(words)
+        })
+    return rows
+
+
+def baseline_filter(rows: List[Dict], min_num_words: int, wsk_threshold: int,
+                    stop_words: List[str]) -> List[Dict]:
+    filtered = []
+    for kw in rows:
+        word = kw.get("destination_key") or kw.get("word", "")
+        if kw.get("numwords", 0) < min_num_words:
+            continue
+        if kw.get("wsk", 999999) > wsk_threshold:
+            continue
+        text_lower = word.lower()
+        if any(sw.strip() and sw.strip().lower() in text_lower for sw in stop_words):
+            continue
+        if len(word) < 5 or re.search(r'[^\w\s\-]', word):
+            continue
+        words = word.split()
+        if len(set(words)) < len(words) * 0.5:
+            continue
+        filtered.append(kw)
+    return filtered
+
+
+def measure(name: str, func, rows: List[Dict]) -> List[Dict]:
+    start = time.perf_counter()
+    result = func(rows)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<28} {elapsed:8.3f} сек  {len(rows) / elapsed:12,.0f} строк/сек  ({len(result)} прошло)")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк локального фильтра ключей")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--stop-words", type=int, default=len(STOP_WORDS),
+                        help="Размер списка стоп-слов (дополняется синтетическими словами)")
+    args = parser.parse_args()
+
+    stop_words = list(STOP_WORDS)
+    rng = random.Random(7)
+    while len(stop_words) < args.stop_words:
+        stop_words.append("".join(rng.choice("абвгдежзиклмнопрстуфхцчшщэюя") for _ in range(rng.randint(4, 9))))
+
+    print(f"Генерация {args.rows:,} строк, стоп-слов: {len(stop_words)}...")
+    rows = generate_rows(args.rows)
+
+    records = [KeywordRecord.from_api(row) for row in rows]
+
+    keyword_filter = KeywordFilter(3, 80, stop_words)
+    expected = measure("baseline (_filter_keywords)", lambda r: baseline_filter(r, 3, 80, stop_words), rows)
+    result = measure("KeywordFilter.filter", keyword_filter.filter, records)
+
+    if [kw["destination_key"] for kw in expected] != [kw.word for kw in result]:
+        print("❌ Результаты фильтров различаются")
+        sys.exit(1)
+
+    # Пороги и стоп-слова уже применены сервером, локально остается только проверка фразы
+    config = SimpleNamespace(min_num_words=3, wsk_threshold=80, ws_threshold=0, stop_words=stop_words,
+                             safe_filters=True, ad_filters=None)
+    filters = FilterExpression.from_config(config)
+    matches = filters.mirror()
+    server_side = [kw for kw in records if matches(kw)]
+    residual = measure("остаток после сервера", filters.local().filter, server_side)
+    if [kw.word for kw in residual] != [kw.word for kw in result]:
+        print("❌ Сервер + остаток не совпадает с полным фильтром")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+import re
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Any, Dict, Optional, Sequence, Tuple
+from urllib.parse import urlparse, parse_qs
+from keyword_filter import FilterExpression
+from keyword_record import KeywordRecord
+
+
+SPEC_PATH = "openapi.json"
+
+ROUTES = (
+    ("POST", "/tools/suggest", "suggest"),
+    ("POST", "/tools/extended_keywords", "create_job"),
+    ("GET", "/tools/extended_keywords/state/<uid>", "job_state"),
+    ("GET", "/tools/extended_keywords/<uid>", "job_page"),
+    ("POST", "/tools/delete_double", "delete_double"),
+    ("POST", "/tools/keywords_by_list", "create_list_job"),
+    ("GET", "/tools/keywords_by_list/<uid>", "list_page"),
+    ("GET", "/report/simple/keyword_dashboard", "dashboard")
+)
+
+TAILS = ["недорого", "цена", "отзывы", "москва", "круглосуточно", "с доставкой", "рядом", "как выбрать"]
+
+
+def _schema(spec: Dict, path: str, method: str) -> Dict:
+    operation = spec["paths"][path][method.lower()]
+    return operation["responses"]["200"]["content"]["application/json"]["schema"]["properties"]
+
+
+def _required(spec: Dict, path: str, method: str) -> Tuple[str, ...]:
+    operation = spec["paths"][path][method.lower()]
+    if "requestBody" in operation:
+        return tuple(operation["requestBody"]["content"]["application/json"]["schema"].get("required", []))
+    return tuple(
+        parameter["name"] for parameter in operation.get("parameters", [])
+        if parameter.get("required") and parameter.get("in") == "query"
+    )
+
+
+def _example(schema: Dict) -> Any:
+    if "example" in schema:
+        return schema["example"]
+    return {"integer": 0, "string": "", "boolean": False, "array": []}.get(schema.get("type"))
+
+
+class MockKeysServer:
+    def __init__(self, spec_path: str = SPEC_PATH, host: str = "127.0.0.1", port: int = 0,
+                 latency: float = 0.02, jitter: float = 0.0, rows_per_job: int = 5000,
+                 job_seconds: float = 1.0, rate_202: float = 0.0, rate_429: float = 0.0,
+                 rate_500: float = 0.0, retry_after: int = 1, seed: int = 0,
+                 apply_filters: bool = False):
+        with open(spec_path, encoding="utf-8") as f:
+            spec = json.load(f)
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.rows_per_job = rows_per_job
+        self.job_seconds = job_seconds
+        self.rate_202 = rate_202
+        self.rate_429 = rate_429
+        self.rate_500 = rate_500
+        self.retry_after = retry_after
+        self.apply_filters = apply_filters
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.jobs: Dict[str, Dict] = {}
+        self.stats = {"requests": 0, "bytes": 0, "rows": 0, "endpoints": {}, "statuses": {}}
+
+        self.routes = []
+        for method, path, handler in ROUTES:
+            pattern = re.compile("^" + re.sub(r"<\w+>", r"([^/]+)", path) + "$")
+            self.routes.append((method, path, pattern, getattr(self, f"_{handler}"), _required(spec, path, method)))
+        self.row_fields = _schema(spec, "/tools/extended_keywords/<uid>", "GET")["data"]["items"]["properties"]
+        self.list_fields = _schema(spec, "/tools/keywords_by_list/<uid>", "GET")["data"]["items"]["properties"]
+        self.dashboard = {
+            field: _example(schema)
+            for field, schema in _schema(spec, "/report/simple/keyword_dashboard", "GET").items()
+        }
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self._server.server_address[1]}"
+
+    def start(self) -> str:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                server._dispatch(self, "GET")
+
+            def do_POST(self):
+                server._dispatch(self, "POST")
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def reset_stats(self):
+        with self.lock:
+            self.stats = {"requests": 0, "bytes": 0, "rows": 0, "endpoints": {}, "statuses": {}}
+
+    def _dispatch(self, handler: BaseHTTPRequestHandler, method: str):
+        url = urlparse(handler.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        body = {}
+        if method == "POST":
+            length = int(handler.headers.get("Content-Length") or 0)
+            body = json.loads(handler.rfile.read(length) or b"{}")
+
+        delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay:
+            time.sleep(delay)
+
+        endpoint = url.path
+        status, payload, headers = 404, {"message": "Not found"}, {}
+        for route_method, path, pattern, route, required in self.routes:
+            match = pattern.match(url.path)
+            if route_method != method or not match:
+                continue
+            endpoint = path
+            params = body if method == "POST" else query
+            if not handler.headers.get("X-Keyso-TOKEN"):
+                status, payload = 401, {"message": "Unauthorized"}
+            elif any(name not in params for name in required):
+                status, payload = 400, {"message": f"Required: {', '.join(required)}"}
+            else:
+                status, payload, headers = self._inject() or route(params, *match.groups())
+            break
+
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(data)))
+        for name, value in headers.items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        handler.wfile.write(data)
+
+        with self.lock:
+            self.stats["requests"] += 1
+            self.stats["bytes"] += len(data)
+            self.stats["endpoints"][endpoint] = self.stats["endpoints"].get(endpoint, 0) + 1
+            self.stats["statuses"][status] = self.stats["statuses"].get(status, 0) + 1
+
+    def _inject(self) -> Optional[Tuple[int, Dict, Dict]]:
+        with self.lock:
+            roll = self.random.random()
+        if roll < self.rate_429:
+            return 429, {"message": "Too many requests"}, {"Retry-After": str(self.retry_after)}
+        roll -= self.rate_429
+        if roll < self.rate_500:
+            return 500, {"message": "Internal error"}, {}
+        roll -= self.rate_500
+        if roll < self.rate_202:
+            return 202, {}, {}
+        return None
+
+    def _suggest(self, body: Dict) -> Tuple[int, Dict, Dict]:
+        keys = [f"{phrase} {TAILS[i % len(TAILS)]}" for i, phrase in enumerate(body["list"])]
+        return 200, {"link": "", "keys": keys}, {}
+
+    def _create_job(self, body: Dict) -> Tuple[int, Dict, Dict]:
+        with self.lock:
+            uid = f"{len(self.jobs):032x}"
+            self.jobs[uid] = {"created": time.monotonic(), "list": list(body["list"]) or ["фраза"]}
+        return 200, {"uid": uid}, {}
+
+    def _job_state(self, query: Dict, uid: str) -> Tuple[int, Dict, Dict]:
+        job = self.jobs.get(uid)
+        if job is None:
+            return 404, {"message": "Not found"}, {}
+        elapsed = time.monotonic() - job["created"]
+        progress = 100 if self.job_seconds <= 0 else min(100, int(elapsed / self.job_seconds * 100))
+        return 200, {"state": 10 if progress >= 100 else 1, "progress": progress}, {}
+
+    def _job_page(self, query: Dict, uid: str) -> Tuple[int, Dict, Dict]:
+        job = self.jobs.get(uid)
+        if job is None:
+            return 404, {"message": "Not found"}, {}
+        page = max(1, int(query.get("page", 1)))
+        per_page = max(1, min(1000, int(query.get("per_page", 25))))
+        indexes = self._matching(job, query.get("filter", ""))
+        total = len(indexes)
+        start = (page - 1) * per_page
+        rows = [self._row(job["list"], i) for i in indexes[start:start + per_page]]
+        with self.lock:
+            self.stats["rows"] += len(rows)
+        return 200, {
+            "current_page": page,
+            "per_page": per_page,
+            "last_page": max(1, -(-total // per_page)),
+            "total": total,
+            "data": rows
+        }, {}
+
+    def _matching(self, job: Dict, filters: str) -> Sequence[int]:
+        if not self.apply_filters or not filters:
+            return range(self.rows_per_job)
+        with self.lock:
+            matching = job.setdefault("filtered", {}).get(filters)
+        if matching is None:
+            matches = FilterExpression.parse(filters).mirror()
+            matching = [
+                i for i in range(self.rows_per_job)
+                if matches(KeywordRecord.from_api(self._row(job["list"], i)))
+            ]
+            with self.lock:
+                job["filtered"][filters] = matching
+        return matching
+
+    def _row(self, phrases, i: int) -> Dict:
+        source = phrases[i % len(phrases)]
+        destination = f"{source} {TAILS[i % len(TAILS)]} {i}"
+        values = {
+            "source_key": source,
+            "destination_key": destination,
+            "wsk": i * 100 // max(1, self.rows_per_job),
+            "ws": i * 10,
+            "numwords": len(destination.split()),
+            "isgeo": int("москва" in destination),
+            "isquest": int(destination.startswith(("как", "где"))),
+            "addition": i % 5 == 0
+        }
+        return {
+            field: values.get(field, i % 50 if schema.get("type") == "integer" else _example(schema))
+            for field, schema in self.row_fields.items()
+        }
+
+    def _delete_double(self, body: Dict) -> Tuple[int, Dict, Dict]:
+        seen = set()
+        keys, exclude = [], []
+        for phrase in body["list"]:
+            key = " ".join(sorted(phrase.lower().split()))
+            if key in seen:
+                exclude.append(phrase)
+            else:
+                seen.add(key)
+                keys.append(phrase)
+        return 200, {"keys": keys, "exclude": exclude}, {}
+
+    def _create_list_job(self, body: Dict) -> Tuple[int, Dict, Dict]:
+        with self.lock:
+            uid = f"{len(self.jobs):032x}"
+            self.jobs[uid] = {"created": time.monotonic(), "list": list(body["list"])}
+        return 200, {"uid": uid}, {}
+
+    def _list_page(self, query: Dict, uid: str) -> Tuple[int, Dict, Dict]:
+        job = self.jobs.get(uid)
+        if job is None:
+            return 404, {"message": "Not found"}, {}
+        if time.monotonic() - job["created"] < self.job_seconds:
+            return 202, {}, {}
+        page = max(1, int(query.get("page", 1)))
+        per_page = max(1, min(1000, int(query.get("per_page", 25))))
+        # Каждая десятая фраза "не найдена", чтобы клиент проверял ее через дашборд
+        words = [word for i, word in enumerate(job["list"]) if i % 10 != 9]
+        start = (page - 1) * per_page
+        rows = []
+        for i, word in enumerate(words[start:start + per_page], start):
+            values = {"word": word, "numwords": len(word.split())}
+            rows.append({
+                field: values.get(field, i % 50 if schema.get("type") == "integer" else _example(schema))
+                for field, schema in self.list_fields.items()
+            })
+        with self.lock:
+            self.stats["rows"] += len(rows)
+        return 200, {
+            "current_page": page,
+            "per_page": per_page,
+            "last_page": max(1, -(-len(words) // per_page)),
+            "total": len(words),
+            "data": rows
+        }, {}
+
+    def _dashboard(self, query: Dict) -> Tuple[int, Dict, Dict]:
+        return 200, dict(self.dashboard, word=query["keyword"]), {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Локальный mock-сервер Keys.so API по openapi.json")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.02, help="Задержка ответа, сек")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Случайная добавка к задержке, сек")
+    parser.add_argument("--rows", type=int, default=5000, help="Строк в результате одного задания")
+    parser.add_argument("--job-seconds", type=float, default=1.0, help="Время построения задания, сек")
+    parser.add_argument("--rate-202", type=float, default=0.0)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--rate-500", type=float, default=0.0)
+    parser.add_argument("--filters", action="store_true", help="Применять параметр filter к результатам заданий")
+    args = parser.parse_args()
+
+    server = MockKeysServer(
+        port=args.port, latency=args.latency, jitter=args.jitter, rows_per_job=args.rows,
+        job_seconds=args.job_seconds, rate_202=args.rate_202, rate_429=args.rate_429,
+        rate_500=args.rate_500, apply_filters=args.filters
+    )
+    print(f"🧪 Mock Keys.so API: {server.start()} (Ctrl+C для остановки)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
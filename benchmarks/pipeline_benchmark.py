@@ -0,0 +1,118 @@
+import io
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+from contextlib import redirect_stdout
+from typing import Dict, List
+from api_client import KeysAPIClient
+from config import Config
+from keyword_processor import KeywordProcessor
+from rate_limiter import RateLimiter
+from seed_generator import SeedGenerator
+from benchmarks.mock_server import MockKeysServer
+
+
+SCENARIOS = {
+    "clean": {},
+    "busy": {"rate_202": 0.05, "rate_429": 0.05},
+    "flaky": {"rate_500": 0.05}
+}
+
+
+def run_scenario(server: MockKeysServer, seeds: List[str], args) -> Dict:
+    config = Config(
+        api_token="benchmark",
+        niche=args.niche,
+        stop_words=["бесплатно", "видео", "скачать"],
+        wsk_threshold=100,
+        max_concurrency=args.concurrency,
+        extended_chunk_size=args.chunk_size,
+        poll_budget=args.rate * 10,
+        cache_enabled=False,
+        api_base_url=server.base_url
+    )
+    client = KeysAPIClient(
+        config.api_token,
+        rate_limiter=RateLimiter(max_requests=args.rate, time_window=1),
+        base_url=config.api_base_url
+    )
+    processor = KeywordProcessor(client, config)
+    server.reset_stats()
+
+    output = io.StringIO()
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        with redirect_stdout(sys.stdout if args.verbose else output):
+            keywords = processor.process_pipeline(seeds)
+    finally:
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        processor.close()
+        client.session.close()
+
+    stats = server.stats
+    summary = client.metrics.summary()
+    return {
+        "seconds": round(elapsed, 3),
+        "requests": stats["requests"],
+        "bytes": stats["bytes"],
+        "rows": stats["rows"],
+        "keywords": len(keywords),
+        "peak_mb": round(peak / 1024 / 1024, 1),
+        "rows_per_sec": round(stats["rows"] / elapsed) if elapsed else 0,
+        "retries": summary["retries"],
+        "rate_limit_seconds": summary["rate_limit"]["seconds"],
+        "statuses": {str(code): count for code, count in sorted(stats["statuses"].items())}
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сквозной бенчмарк process_pipeline на локальном mock-сервере")
+    parser.add_argument("--niche", type=str, default="доставка цветов в москве")
+    parser.add_argument("--seeds", type=int, default=100, help="Сколько семян сгенерировать")
+    parser.add_argument("--rows", type=int, default=5000, help="Строк в результате одного задания")
+    parser.add_argument("--latency", type=float, default=0.02, help="Задержка ответа сервера, сек")
+    parser.add_argument("--job-seconds", type=float, default=1.0, help="Время построения задания, сек")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--rate", type=int, default=100, help="Лимит клиента, запросов в секунду")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), action="append",
+                        help="Сценарий ошибок сервера (можно несколько; по умолчанию все)")
+    parser.add_argument("--filters", action="store_true",
+                        help="Mock-сервер применяет параметр filter, как настоящий API")
+    parser.add_argument("--json", type=str, help="Сохранить результаты в JSON-файл")
+    parser.add_argument("--verbose", action="store_true", help="Показывать вывод пайплайна")
+    args = parser.parse_args()
+
+    seeds = SeedGenerator(args.niche).generate(count=args.seeds)
+    print(f"Семян: {len(seeds)}, строк на задание: {args.rows:,}, задержка: {args.latency} сек")
+    print(f"{'сценарий':<8} {'время':>9} {'запросов':>9} {'МБ отдано':>10} {'пик МБ':>8} "
+          f"{'строк/сек':>11} {'ключей':>8}")
+
+    results = {}
+    for name in args.scenario or list(SCENARIOS):
+        server = MockKeysServer(
+            latency=args.latency, rows_per_job=args.rows, job_seconds=args.job_seconds,
+            retry_after=0, apply_filters=args.filters, **SCENARIOS[name]
+        )
+        server.start()
+        try:
+            result = run_scenario(server, seeds, args)
+        finally:
+            server.stop()
+        results[name] = result
+        print(f"{name:<8} {result['seconds']:8.2f}с {result['requests']:>9} "
+              f"{result['bytes'] / 1024 / 1024:>10.1f} {result['peak_mb']:>8.1f} "
+              f"{result['rows_per_sec']:>11,} {result['keywords']:>8}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import gc
+import argparse
+import tracemalloc
+from typing import Dict, Iterator, List
+from keyword_record import KeywordRecord
+from benchmarks.filter_benchmark import WORDS
+
+
+PAGE_SIZE = 1000
+
+
+def api_page(start: int, count: int) -> List[Dict]:
+    rows = []
+    for i in range(start, start + count):
+        words = [WORDS[(i + j) % len(WORDS)] for j in range(3 + i % 4)]
+        rows.append({
+            "source_key": " ".join(words[:2]),
+            "destination_key": " ".join(words) + f" {i}",
+            "ws": i % 5000,
+            "wsk": i % 200,
+            "frequency": 0,
+            "numwords": len(words) + 1,
+            "adscnt": i % 7,
+            "docs": i * 13,
+            "avbid": i % 30,
+            "isgeo": 0,
+            "isquest": i % 2,
+            "addition": False,
+            "cnt": i % 100,
+            "maxcpc": 0,
+            "mincpc": 0
+        })
+    return rows
+
+
+def api_pages(total: int) -> Iterator[List[Dict]]:
+    for start in range(0, total, PAGE_SIZE):
+        yield api_page(start, min(PAGE_SIZE, total - start))
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    data = build()
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return data, current / 1024 / 1024, peak / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Память на хранение ключей: dict против KeywordRecord")
+    parser.add_argument("--rows", type=int, default=200_000)
+    args = parser.parse_args()
+
+    def as_dicts():
+        rows = []
+        for page in api_pages(args.rows):
+            rows.extend(page)
+        return rows
+
+    def as_records():
+        rows = []
+        for page in api_pages(args.rows):
+            rows.extend(KeywordRecord.from_api(row) for row in page)
+        return rows
+
+    dicts, dict_current, dict_peak = measure(as_dicts)
+    del dicts
+    records, record_current, record_peak = measure(as_records)
+    del records
+
+    print(f"{args.rows:,} строк, страницы по {PAGE_SIZE}")
+    print(f"dict из API     хранится {dict_current:8.1f} МБ, пик {dict_peak:8.1f} МБ")
+    print(f"KeywordRecord   хранится {record_current:8.1f} МБ, пик {record_peak:8.1f} МБ")
+    print(f"экономия пиковой памяти: {(1 - record_peak / dict_peak) * 100:.0f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import os
+import json
+import uuid
+import shutil
+import hashlib
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from keyword_record import KeywordRecord
+
+
+class RunCheckpoint:
+    CONFIG_FIELDS = (
+        "niche", "base", "region_id", "multi_region", "regions", "seed_targets",
+        "wsk_threshold", "ws_threshold", "min_num_words", "stop_words", "max_results",
+        "return_top", "ad_filters", "safe_filters", "extended_chunk_size",
+        "dedup_mode", "dedup_stemming", "incremental"
+    )
+
+    def __init__(self, root: str = "runs", run_id: Optional[str] = None):
+        self.run_id = run_id or f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+        self.directory = os.path.join(root, self.run_id)
+        self.pages_dir = os.path.join(self.directory, "pages")
+        self.state_path = os.path.join(self.directory, "state.json")
+        self.results_path = os.path.join(self.directory, "results.ndjson")
+        self.state: Dict[str, Any] = {"run_id": self.run_id, "jobs": {}}
+
+        if os.path.exists(self.state_path):
+            with open(self.state_path, encoding="utf-8") as f:
+                self.state = json.load(f)
+        os.makedirs(self.directory, exist_ok=True)
+
+    @classmethod
+    def resume(cls, run_id: str, root: str = "runs") -> "RunCheckpoint":
+        if not os.path.exists(os.path.join(root, run_id, "state.json")):
+            raise Exception(f"❌ Запуск {run_id} не найден в {root}")
+        return cls(root, run_id)
+
+    def get(self, stage: str, default: Any = None) -> Any:
+        return self.state.get(stage, default)
+
+    def save(self, stage: str, value: Any):
+        self.state[stage] = value
+        self._write_state()
+
+    def save_config(self, config):
+        self.save("config", {field: getattr(config, field) for field in self.CONFIG_FIELDS})
+
+    def restore_config(self, config):
+        for field, value in self.get("config", {}).items():
+            setattr(config, field, value)
+
+    def job(self, index: int, keywords: List[str]) -> Dict:
+        job = self.state["jobs"].get(str(index))
+        if job is None or job.get("keywords") != self._fingerprint(keywords):
+            return {}
+        return job
+
+    def start_job(self, index: int, keywords: List[str], uid: str):
+        self.state["jobs"][str(index)] = {
+            "keywords": self._fingerprint(keywords),
+            "uid": uid,
+            "last_page": None,
+            "pages": [],
+            "done": False
+        }
+        os.makedirs(self.pages_dir, exist_ok=True)
+        for name in os.listdir(self.pages_dir):
+            if name.startswith(f"{index}_"):
+                os.remove(os.path.join(self.pages_dir, name))
+        self._write_state()
+
+    def save_page(self, index: int, page: int, last_page: int, keywords: List[KeywordRecord]):
+        self._write_records(self._page_path(index, page), keywords)
+        job = self.state["jobs"][str(index)]
+        job["last_page"] = last_page
+        job["pages"].append(page)
+        self._write_state()
+
+    def load_page(self, index: int, page: int) -> List[KeywordRecord]:
+        return self._read_records(self._page_path(index, page))
+
+    def finish_job(self, index: int):
+        self.state["jobs"][str(index)]["done"] = True
+        self._write_state()
+
+    def save_results(self, keywords: List[KeywordRecord]):
+        self._write_records(self.results_path, keywords)
+        self.state["results"] = len(keywords)
+        self._write_state()
+        shutil.rmtree(self.pages_dir, ignore_errors=True)
+
+    def load_results(self) -> Optional[List[KeywordRecord]]:
+        if "results" not in self.state:
+            return None
+        return self._read_records(self.results_path)
+
+    def remove(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _page_path(self, index: int, page: int) -> str:
+        return os.path.join(self.pages_dir, f"{index}_{page}.ndjson")
+
+    def _write_state(self):
+        self._atomic_write(self.state_path, json.dumps(self.state, ensure_ascii=False))
+
+    def _write_records(self, path: str, keywords: List[KeywordRecord]):
+        self._atomic_write(path, "".join(
+            json.dumps(kw.to_dict(), ensure_ascii=False) + "\n" for kw in keywords
+        ))
+
+    def _read_records(self, path: str) -> List[KeywordRecord]:
+        with open(path, encoding="utf-8") as f:
+            return [KeywordRecord.from_api(json.loads(line)) for line in f if line.strip()]
+
+    @staticmethod
+    def _atomic_write(path: str, content: str):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _fingerprint(keywords: List[str]) -> str:
+        return hashlib.sha1("\n".join(keywords).encode("utf-8")).hexdigest()
@@ -1,7 +1,8 @@
 import os
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from dotenv import load_dotenv
+from keyword_record import KeywordRecord
 
 load_dotenv()
 
@@ -13,6 +14,10 @@ class Config:
     region_id: int = 213
     niche: str = ""
     seed_targets: Optional[List[str]] = None
+    seed_count: int = 100
+    seed_fanout: Optional[int] = None
+    seed_depth: int = 3
+    seed_modifiers: Optional[str] = None
     wsk_threshold: int = 80
     ws_threshold: int = 1000
     min_num_words: int = 3
@@ -25,6 +30,34 @@ class Config:
     offline_mode: bool = False
     multi_region: bool = False
     regions: Optional[List[int]] = None
+    max_concurrency: int = 4
+    rate_limit_burst: int = 10
+    shared_rate_limit: bool = False
+    extended_chunk_size: int = 500
+    chunk_retries: int = 2
+    job_timeout: int = 600
+    poll_budget: int = 4
+    dedup_mode: str = "api"
+    dedup_stemming: bool = False
+    cache_enabled: bool = True
+    cache_refresh: bool = False
+    cache_path: str = ".keyshunter_cache.sqlite"
+    cache_max_mb: int = 256
+    stream_mode: bool = False
+    export_gzip: bool = False
+    runs_dir: str = "runs"
+    resume_run: Optional[str] = None
+    batch_parallel: int = 4
+    incremental: bool = False
+    since: Optional[str] = None
+    delta_fields: Tuple[str, ...] = ("wsk", "ws")
+    seed_store_path: str = ".keyshunter_seeds.sqlite"
+    seed_store_ttl: int = 604800
+    api_base_url: Optional[str] = None
+    metrics_dir: Optional[str] = None
+    profile_mode: Optional[str] = None
+    profile_dir: str = "profiles"
+    validation_size: Optional[int] = None
 
     @classmethod
     def from_env(cls):
@@ -37,6 +70,10 @@ class Config:
             region_id=int(os.getenv("REGION_ID", "213")),
             niche=os.getenv("NICHE", ""),
             seed_targets=os.getenv("SEED_TARGETS", "").split(",") if os.getenv("SEED_TARGETS") else None,
+            seed_count=int(os.getenv("SEED_COUNT", "100")),
+            seed_fanout=int(os.getenv("SEED_FANOUT")) if os.getenv("SEED_FANOUT") else None,
+            seed_depth=int(os.getenv("SEED_DEPTH", "3")),
+            seed_modifiers=os.getenv("SEED_MODIFIERS") or None,
             wsk_threshold=int(os.getenv("WSK_THRESHOLD", "80")),
             ws_threshold=int(os.getenv("WS_THRESHOLD", "1000")),
             min_num_words=int(os.getenv("MIN_NUM_WORDS", "3")),
@@ -48,6 +85,32 @@ class Config:
             offline_mode=os.getenv("OFFLINE_MODE", "0") == "1",
             multi_region=multi_region,
             regions=[int(r.strip()) for r in regions_str.split(",")] if regions_str and multi_region else None,
+            max_concurrency=int(os.getenv("MAX_CONCURRENCY", "4")),
+            rate_limit_burst=int(os.getenv("RATE_LIMIT_BURST", "10")),
+            shared_rate_limit=os.getenv("SHARED_RATE_LIMIT", "0") == "1",
+            extended_chunk_size=int(os.getenv("EXTENDED_CHUNK_SIZE", "500")),
+            chunk_retries=int(os.getenv("CHUNK_RETRIES", "2")),
+            job_timeout=int(os.getenv("JOB_TIMEOUT", "600")),
+            poll_budget=int(os.getenv("POLL_BUDGET", "4")),
+            dedup_mode=os.getenv("DEDUP_MODE", "api"),
+            dedup_stemming=os.getenv("DEDUP_STEMMING", "0") == "1",
+            cache_ttl=int(os.getenv("CACHE_TTL", "86400")),
+            cache_enabled=os.getenv("CACHE_ENABLED", "1") == "1",
+            cache_path=os.getenv("CACHE_PATH", ".keyshunter_cache.sqlite"),
+            cache_max_mb=int(os.getenv("CACHE_MAX_MB", "256")),
+            stream_mode=os.getenv("STREAM_MODE", "0") == "1",
+            export_gzip=os.getenv("EXPORT_GZIP", "0") == "1",
+            runs_dir=os.getenv("RUNS_DIR", "runs"),
+            batch_parallel=int(os.getenv("BATCH_PARALLEL", "4")),
+            incremental=os.getenv("INCREMENTAL", "0") == "1",
+            delta_fields=tuple(f.strip() for f in os.getenv("DELTA_FIELDS", "wsk,ws").split(",") if f.strip()),
+            seed_store_path=os.getenv("SEED_STORE_PATH", ".keyshunter_seeds.sqlite"),
+            seed_store_ttl=int(os.getenv("SEED_STORE_TTL", "604800")),
+            api_base_url=os.getenv("API_BASE_URL") or None,
+            metrics_dir=os.getenv("METRICS_DIR") or None,
+            profile_mode=os.getenv("PROFILE") or None,
+            profile_dir=os.getenv("PROFILE_DIR", "profiles"),
+            validation_size=int(os.getenv("VALIDATION_SIZE")) if os.getenv("VALIDATION_SIZE") else None,
         )
 
     def validate(self):
@@ -59,3 +122,28 @@ class Config:
             raise ValueError("MIN_NUM_WORDS должен быть >= 1")
         if self.multi_region and not self.regions:
             raise ValueError("При MULTI_REGION=1 необходимо указать REGIONS")
+        if self.max_concurrency < 1:
+            raise ValueError("MAX_CONCURRENCY должен быть >= 1")
+        if self.dedup_mode not in ("local", "api", "check"):
+            raise ValueError("DEDUP_MODE должен быть local, api или check")
+        if self.extended_chunk_size < 1:
+            raise ValueError("EXTENDED_CHUNK_SIZE должен быть >= 1")
+        if self.chunk_retries < 0:
+            raise ValueError("CHUNK_RETRIES должен быть >= 0")
+        if self.poll_budget < 1:
+            raise ValueError("POLL_BUDGET должен быть >= 1")
+        if self.batch_parallel < 1:
+            raise ValueError("BATCH_PARALLEL должен быть >= 1")
+        if self.seed_count < 1:
+            raise ValueError("SEED_COUNT должен быть >= 1")
+        if not 1 <= self.seed_depth <= 4:
+            raise ValueError("SEED_DEPTH должен быть от 1 до 4")
+        if self.seed_fanout is not None and self.seed_fanout < 1:
+            raise ValueError("SEED_FANOUT должен быть >= 1")
+        unknown = set(self.delta_fields) - set(KeywordRecord.FIELDS[1:])
+        if unknown:
+            raise ValueError(f"DELTA_FIELDS: неизвестные поля {', '.join(sorted(unknown))}")
+        if self.profile_mode not in (None, "time", "cprofile", "memory", "full"):
+            raise ValueError("PROFILE должен быть time, cprofile, memory или full")
+        if self.validation_size is not None and self.validation_size < 0:
+            raise ValueError("VALIDATION_SIZE должен быть >= 0")
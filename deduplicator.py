@@ -0,0 +1,96 @@
+import re
+from typing import Dict, List
+from keyword_record import KeywordRecord
+
+try:
+    import snowballstemmer
+except ImportError:
+    snowballstemmer = None
+
+
+_TOKEN_RE = re.compile(r"[\w\-]+")
+
+_RUSSIAN_ENDINGS = tuple(sorted({
+    "иями", "ями", "ами", "ого", "его", "ому", "ему", "ыми", "ими", "иях",
+    "ать", "ять", "ить", "еть", "ешь", "ишь", "ете", "ите", "ая", "яя",
+    "ое", "ее", "ые", "ие", "ый", "ий", "ой", "ую", "юю", "ом", "ем",
+    "ам", "ям", "ах", "ях", "ов", "ев", "ей", "ым", "им", "ть",
+    "а", "я", "о", "е", "ы", "и", "у", "ю", "ь", "й"
+}, key=len, reverse=True))
+
+
+def _light_stem(word: str) -> str:
+    if len(word) <= 4:
+        return word
+    for ending in _RUSSIAN_ENDINGS:
+        if word.endswith(ending) and len(word) - len(ending) >= 3:
+            return word[:-len(ending)]
+    return word
+
+
+class Deduplicator:
+    def __init__(self, stemming: bool = False, compat: bool = False, metric: str = "wsk"):
+        self.stemming = stemming and not compat
+        self.compat = compat
+        self.metric = metric
+        self._stem = _light_stem
+        self._seen = set()
+        if self.stemming and snowballstemmer is not None:
+            self._stem = snowballstemmer.stemmer("russian").stemWord
+
+    def key(self, text: str) -> str:
+        tokens = _TOKEN_RE.findall(text.lower().replace("ё", "е"))
+        if self.stemming:
+            tokens = [self._stem(token) for token in tokens]
+        tokens.sort()
+        return " ".join(tokens)
+
+    def deduplicate_words(self, words: List[str]) -> List[str]:
+        seen = set()
+        unique = []
+        for word in words:
+            key = self.key(word)
+            if key not in seen:
+                seen.add(key)
+                unique.append(word)
+        return unique
+
+    def deduplicate(self, keywords: List[KeywordRecord]) -> List[KeywordRecord]:
+        metric = self.metric
+        positions = {}
+        unique = []
+        replaced = False
+        for kw in keywords:
+            key = self.key(kw.word)
+            index = positions.get(key)
+            if index is None:
+                positions[key] = len(unique)
+                unique.append(kw)
+            elif not self.compat and getattr(kw, metric) > getattr(unique[index], metric):
+                unique[index] = kw
+                replaced = True
+        # Замена на дубль с большим WSK нарушает порядок, на который рассчитывают экспорт и TopK
+        if replaced:
+            unique.sort(key=KeywordRecord.sort_key)
+        return unique
+
+    def unseen(self, keywords: List[KeywordRecord]) -> List[KeywordRecord]:
+        seen = self._seen
+        unique = []
+        for kw in keywords:
+            key = hash(self.key(kw.word))
+            if key not in seen:
+                seen.add(key)
+                unique.append(kw)
+        return unique
+
+    @staticmethod
+    def compare(local: List[str], server: List[str]) -> Dict[str, int]:
+        local_set = set(local)
+        server_set = set(server)
+        return {
+            "local": len(local_set),
+            "server": len(server_set),
+            "only_local": len(local_set - server_set),
+            "only_server": len(server_set - local_set)
+        }
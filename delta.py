@@ -0,0 +1,127 @@
+import os
+import csv
+import gzip
+import json
+import hashlib
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterator, List, Optional, Tuple
+from keyword_record import KeywordRecord
+
+
+INDEX_EXTENSION = ".kidx"
+
+
+def _open_text(path: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    return open(path, encoding="utf-8", newline="")
+
+
+def read_export(path: str) -> Iterator[KeywordRecord]:
+    name = path[:-3] if path.endswith(".gz") else path
+    with _open_text(path) as f:
+        if name.endswith(".csv"):
+            for row in csv.DictReader(f):
+                yield KeywordRecord.from_api(row)
+        elif name.endswith(".ndjson"):
+            for line in f:
+                if line.strip():
+                    yield KeywordRecord.from_api(json.loads(line))
+        elif name.endswith(".json"):
+            for row in json.load(f):
+                yield KeywordRecord.from_api(row)
+        else:
+            raise ValueError(f"❌ Неизвестный формат выгрузки: {path} (ожидается csv, json, ndjson или {INDEX_EXTENSION})")
+
+
+class KeywordIndex:
+    MAGIC = b"KHIDX1\n"
+
+    def __init__(self, fields: Tuple[str, ...] = ("wsk", "ws")):
+        self.fields = tuple(fields)
+        self.keys = array("Q")
+        self.values = array("I")
+        self.pending: Dict[int, int] = {}
+        self.new = 0
+        self.changed = 0
+        self.unchanged = 0
+
+    @staticmethod
+    def _key(word: str) -> int:
+        return int.from_bytes(hashlib.blake2b(word.lower().encode("utf-8"), digest_size=8).digest(), "little")
+
+    def _value(self, kw: KeywordRecord) -> int:
+        metrics = "|".join(str(getattr(kw, field)) for field in self.fields)
+        return int.from_bytes(hashlib.blake2b(metrics.encode("utf-8"), digest_size=4).digest(), "little")
+
+    @classmethod
+    def load(cls, path: str, fields: Tuple[str, ...] = ("wsk", "ws")) -> "KeywordIndex":
+        try:
+            if path.endswith(INDEX_EXTENSION):
+                return cls._read(path)
+            index = cls(fields)
+            for kw in read_export(path):
+                index.pending[cls._key(kw.word)] = index._value(kw)
+        except (OSError, EOFError) as e:
+            raise ValueError(f"❌ Не удалось прочитать {path}: {e}")
+        index._commit()
+        return index
+
+    @classmethod
+    def _read(cls, path: str) -> "KeywordIndex":
+        with open(path, "rb") as f:
+            if f.readline() != cls.MAGIC:
+                raise ValueError(f"❌ {path} не является индексом ключей")
+            index = cls(tuple(json.loads(f.readline())))
+            count = int(f.readline())
+            index.keys.fromfile(f, count)
+            index.values.fromfile(f, count)
+        return index
+
+    def _find(self, key: int) -> Optional[int]:
+        position = bisect_left(self.keys, key)
+        if position < len(self.keys) and self.keys[position] == key:
+            return position
+        return None
+
+    def filter(self, keywords: List[KeywordRecord]) -> List[KeywordRecord]:
+        fresh = []
+        for kw in keywords:
+            key = self._key(kw.word)
+            value = self._value(kw)
+            self.pending[key] = value
+            position = self._find(key)
+            if position is None:
+                self.new += 1
+            elif self.values[position] != value:
+                self.changed += 1
+            else:
+                self.unchanged += 1
+                continue
+            fresh.append(kw)
+        return fresh
+
+    def _commit(self):
+        if not self.pending:
+            return
+        merged = dict(zip(self.keys, self.values))
+        merged.update(self.pending)
+        self.pending = {}
+        keys = sorted(merged)
+        self.keys = array("Q", keys)
+        self.values = array("I", (merged[key] for key in keys))
+
+    def save(self, path: str):
+        self._commit()
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(self.MAGIC)
+            f.write(json.dumps(list(self.fields)).encode("utf-8") + b"\n")
+            f.write(f"{len(self.keys)}\n".encode("ascii"))
+            self.keys.tofile(f)
+            self.values.tofile(f)
+        os.replace(tmp_path, path)
+
+    def __len__(self) -> int:
+        return len(self.keys)
@@ -1,54 +1,174 @@
+import io
 import csv
+import gzip
 import json
-from typing import List, Dict
+from typing import Dict, Iterable, List, Optional
 from datetime import datetime
+from keyword_record import KeywordRecord
+from ranking import StatsAccumulator, top_k
 
 
-class Exporter:
-    @staticmethod
-    def to_csv(keywords: List[Dict], filename: str):
+class StreamWriter:
+    EXTENSION = ""
+    LABEL = ""
+
+    def __init__(self, filename: str, compress: bool = False, buffer_size: int = 1 << 20,
+                 stream: bool = False):
+        self.filename = filename + ".gz" if compress else filename
+        self.compress = compress
+        self.buffer_size = buffer_size
+        # В потоковом режиме каждая пачка сразу уходит на диск, а не копится до buffer_size
+        self.stream = stream
+        self.rows = 0
+        self._file = None
+        self._buffer = io.StringIO()
+
+    def write(self, keywords: List[KeywordRecord]):
         if not keywords:
             return
-        
-        fieldnames = [
-            "word", "wsk", "ws", "numwords", "isquest", "isgeo",
-            "adscnt", "avbid", "docs", "cnt"
+        if self._file is None:
+            self._open()
+        self._format(keywords)
+        self.rows += len(keywords)
+        if self.stream or self._buffer.tell() >= self.buffer_size:
+            self._flush()
+
+    def write_all(self, keywords: Iterable[KeywordRecord], batch_size: int = 1000) -> int:
+        batch = []
+        for kw in keywords:
+            batch.append(kw)
+            if len(batch) >= batch_size:
+                self.write(batch)
+                batch = []
+        self.write(batch)
+        return self.rows
+
+    def close(self):
+        if self._file is None:
+            return
+        self._footer()
+        self._flush()
+        self._file.close()
+        self._file = None
+        print(f"💾 {self.LABEL} сохранен: {self.filename} ({self.rows} строк)")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _open(self):
+        if self.compress:
+            self._file = gzip.open(self.filename, 'wt', encoding='utf-8', newline='')
+        else:
+            self._file = open(self.filename, 'w', encoding='utf-8', newline='')
+        self._header()
+
+    def _flush(self):
+        self._file.write(self._buffer.getvalue())
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        if self.stream:
+            self._file.flush()
+
+    def _header(self):
+        pass
+
+    def _footer(self):
+        pass
+
+    def _format(self, keywords: List[KeywordRecord]):
+        raise NotImplementedError
+
+
+class CSVStreamWriter(StreamWriter):
+    EXTENSION = ".csv"
+    LABEL = "CSV"
+
+    def __init__(self, filename: str, compress: bool = False, buffer_size: int = 1 << 20,
+                 stream: bool = False):
+        super().__init__(filename, compress, buffer_size, stream)
+        self._writer = csv.writer(self._buffer)
+
+    def _header(self):
+        self._writer.writerow(KeywordRecord.FIELDS)
+
+    def _format(self, keywords: List[KeywordRecord]):
+        fieldnames = KeywordRecord.FIELDS
+        self._writer.writerows(
+            [getattr(kw, field) for field in fieldnames]
+            for kw in keywords
+        )
+
+
+class NDJSONStreamWriter(StreamWriter):
+    EXTENSION = ".ndjson"
+    LABEL = "NDJSON"
+
+    def _format(self, keywords: List[KeywordRecord]):
+        dumps = _compact_json
+        self._buffer.write("".join(dumps(kw.to_dict()) + "\n" for kw in keywords))
+
+
+class JSONStreamWriter(StreamWriter):
+    EXTENSION = ".json"
+    LABEL = "JSON"
+
+    def _header(self):
+        self._buffer.write("[")
+
+    def _format(self, keywords: List[KeywordRecord]):
+        separator = "," if self.rows else ""
+        self._buffer.write(separator + ",".join(_compact_json(kw.to_dict()) for kw in keywords))
+
+    def _footer(self):
+        self._buffer.write("]\n")
+
+
+def _compact_json(data: Dict) -> str:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+class Exporter:
+    FORMATS = {
+        "csv": (CSVStreamWriter,),
+        "json": (JSONStreamWriter,),
+        "ndjson": (NDJSONStreamWriter,),
+        "both": (CSVStreamWriter, JSONStreamWriter)
+    }
+
+    @staticmethod
+    def open_writers(base_filename: str, export_format: str, compress: bool = False,
+                     stream: bool = False) -> List[StreamWriter]:
+        return [
+            writer_class(base_filename + writer_class.EXTENSION, compress=compress, stream=stream)
+            for writer_class in Exporter.FORMATS[export_format]
         ]
-        
-        available_fields = set(keywords[0].keys())
-        fieldnames = [f for f in fieldnames if f in available_fields]
-        
-        with open(filename, 'w', encoding='utf-8', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            
-            for kw in keywords:
-                row = {}
-                for field in fieldnames:
-                    value = kw.get(field)
-                    if field == "word":
-                        value = kw.get("destination_key") or kw.get("word", "")
-                    row[field] = value
-                writer.writerow(row)
-        
-        print(f"💾 CSV сохранен: {filename}")
 
     @staticmethod
-    def to_json(keywords: List[Dict], filename: str):
-        clean_keywords = []
-        for kw in keywords:
-            clean_kw = kw.copy()
-            if "destination_key" in clean_kw:
-                clean_kw["word"] = clean_kw.pop("destination_key")
-            clean_keywords.append(clean_kw)
-        
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(clean_keywords, f, ensure_ascii=False, indent=2)
-        
-        print(f"💾 JSON сохранен: {filename}")
+    def to_csv(keywords: Iterable[KeywordRecord], filename: str, compress: bool = False):
+        with CSVStreamWriter(filename, compress=compress) as writer:
+            writer.write_all(keywords)
+
+    @staticmethod
+    def to_json(keywords: Iterable[KeywordRecord], filename: str, compress: bool = False):
+        with JSONStreamWriter(filename, compress=compress) as writer:
+            writer.write_all(keywords)
+
+    @staticmethod
+    def to_ndjson(keywords: Iterable[KeywordRecord], filename: str, compress: bool = False):
+        with NDJSONStreamWriter(filename, compress=compress) as writer:
+            writer.write_all(keywords)
 
     @staticmethod
-    def generate_report(keywords: List[Dict], seeds: List[str], config) -> str:
+    def generate_report(keywords: List[KeywordRecord], seeds: List[str], config,
+                        stats: Optional[StatsAccumulator] = None) -> str:
+        if stats is None:
+            stats = StatsAccumulator(config.stop_words)
+            stats.add(keywords)
+            keywords = top_k(keywords, config.return_top)
+        
         report = []
         report.append("=" * 80)
         report.append(f"НЧ-ключи по нише: {config.niche}")
@@ -61,11 +181,8 @@ class Exporter:
         report.append("-" * 80)
         
         for i, kw in enumerate(keywords[:top_n], 1):
-            word = kw.get("destination_key") or kw.get("word", "")
-            wsk = kw.get("wsk", 0)
-            numwords = kw.get("numwords", 0)
-            report.append(f"{i}. {word}")
-            report.append(f"   └─ wsk: {wsk} · слов: {numwords}")
+            report.append(f"{i}. {kw.word}")
+            report.append(f"   └─ wsk: {kw.wsk} · слов: {kw.numwords}")
         
         report.append("")
         report.append("=" * 80)
@@ -83,15 +200,20 @@ class Exporter:
         report.append("📈 СТАТИСТИКА:")
         report.append("-" * 80)
         report.append(f"Семян сгенерировано: {len(seeds)}")
-        report.append(f"Ключей собрано: {len(keywords)}")
-        report.append(f"Средний WSK: {sum(kw.get('wsk', 0) for kw in keywords) / len(keywords):.0f}")
-        report.append(f"Средняя длина: {sum(kw.get('numwords', 0) for kw in keywords) / len(keywords):.1f} слов")
+        report.append(f"Ключей собрано: {stats.count}")
+        report.append(f"Средний WSK: {stats.mean_wsk:.0f}")
+        report.append(f"WSK: медиана {stats.wsk_percentile(50)} · p90 {stats.wsk_percentile(90)}")
+        report.append(f"Средняя длина: {stats.mean_numwords:.1f} слов")
+        report.append(f"Отфильтровано стоп-словами: ~{stats.stop_words}")
+        
+        report.append("")
+        report.append("Распределение WSK:")
+        for low, high, count in stats.wsk_buckets(config.wsk_threshold):
+            report.append(f"   {low}-{high}: {count}")
         
-        stop_words_filtered = sum(1 for kw in keywords if any(
-            sw in (kw.get("destination_key") or kw.get("word", "")).lower() 
-            for sw in config.stop_words
-        ))
-        report.append(f"Отфильтровано стоп-словами: ~{stop_words_filtered}")
+        report.append("Распределение по длине:")
+        for numwords, count in sorted(stats.numwords_hist.items()):
+            report.append(f"   {numwords} слов: {count}")
         
         report.append("")
         report.append("=" * 80)
@@ -0,0 +1,133 @@
+import time
+import asyncio
+from typing import Awaitable, Callable, Dict, Optional
+from rate_limiter import RateLimiter
+
+
+class PollJob:
+    __slots__ = (
+        "uid", "probe", "future", "deadline", "next_poll", "interval",
+        "progress", "progress_at", "polling"
+    )
+
+    def __init__(self, uid: str, probe: Callable[[], Awaitable[Dict]],
+                 future: asyncio.Future, deadline: float, next_poll: float, interval: float):
+        self.uid = uid
+        self.probe = probe
+        self.future = future
+        self.deadline = deadline
+        self.next_poll = next_poll
+        self.interval = interval
+        self.progress = None
+        self.progress_at = None
+        self.polling = False
+
+
+class JobPoller:
+    def __init__(self, budget: Optional[RateLimiter] = None, min_interval: float = 0.5,
+                 max_interval: float = 10.0, timeout: float = 600):
+        self.budget = budget or RateLimiter(max_requests=4, time_window=10)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.timeout = timeout
+        self.jobs: Dict[str, PollJob] = {}
+        self.polls = 0
+        self._loop = None
+        self._task = None
+        self._wakeup = None
+        self._inflight = set()
+
+    def watch(self, uid: str, probe: Callable[[], Awaitable[Dict]],
+              timeout: Optional[float] = None,
+              callback: Optional[Callable[[str, asyncio.Future], None]] = None) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._task = None
+            self._wakeup = asyncio.Event()
+            self.jobs = {}
+
+        job = self.jobs.get(uid)
+        if job is None:
+            now = time.monotonic()
+            job = PollJob(
+                uid, probe, loop.create_future(),
+                deadline=now + (timeout or self.timeout),
+                next_poll=now + self.min_interval,
+                interval=self.min_interval
+            )
+            self.jobs[uid] = job
+
+        if callback:
+            job.future.add_done_callback(lambda future: callback(uid, future))
+
+        self._wakeup.set()
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._run())
+        return job.future
+
+    async def wait(self, uid: str, probe: Callable[[], Awaitable[Dict]],
+                   timeout: Optional[float] = None) -> Dict:
+        return await self.watch(uid, probe, timeout)
+
+    async def _run(self):
+        while self.jobs:
+            now = time.monotonic()
+            for job in list(self.jobs.values()):
+                if not job.polling and job.next_poll <= now:
+                    job.polling = True
+                    task = asyncio.ensure_future(self._poll(job))
+                    self._inflight.add(task)
+                    task.add_done_callback(self._inflight.discard)
+
+            waiting = [job.next_poll for job in self.jobs.values() if not job.polling]
+            delay = max(0.05, min(waiting) - now) if waiting else self.max_interval
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _poll(self, job: PollJob):
+        try:
+            await self.budget.acquire_async()
+            self.polls += 1
+            state = await job.probe()
+        except Exception as e:
+            self._finish(job, error=e)
+            return
+        finally:
+            job.polling = False
+            self._wakeup.set()
+
+        now = time.monotonic()
+        if state.get("state") == 10:
+            self._finish(job, result=state)
+        elif state.get("state") == 2:
+            self._finish(job, error=Exception("❌ Ошибка обработки отчета"))
+        elif now >= job.deadline:
+            self._finish(job, error=Exception("❌ Превышено время ожидания отчета"))
+        else:
+            progress = state.get("progress", 0)
+            print(f"⏳ Обработка {job.uid}: {progress}%")
+            job.interval = self._next_interval(job, progress, now)
+            job.next_poll = min(now + job.interval, job.deadline)
+
+    def _next_interval(self, job: PollJob, progress: float, now: float) -> float:
+        interval = job.interval * 1.5
+        if job.progress is not None and progress > job.progress:
+            speed = (progress - job.progress) / (now - job.progress_at)
+            interval = (100 - progress) / speed / 2
+        if job.progress is None or progress > job.progress:
+            job.progress = progress
+            job.progress_at = now
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    def _finish(self, job: PollJob, result: Optional[Dict] = None, error: Optional[Exception] = None):
+        self.jobs.pop(job.uid, None)
+        if job.future.done():
+            return
+        if error is not None:
+            job.future.set_exception(error)
+        else:
+            job.future.set_result(result)
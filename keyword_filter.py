@@ -0,0 +1,216 @@
+import re
+import operator
+from typing import Callable, Iterable, List, Optional, Sequence
+from keyword_record import KeywordRecord
+
+
+_INVALID_CHARS_RE = re.compile(r"[^\w\s\-]")
+_CLAUSE_RE = re.compile(r"^\s*(\w+?)\s*(NOT LIKE|LIKE|>=|<=|!=|=|>|<)\s*(.*?)\s*$")
+_NUMBER_RE = re.compile(r"^-?\d+$")
+
+_COMPARISONS = {
+    ">=": operator.ge, "<=": operator.le, "!=": operator.ne,
+    "=": operator.eq, ">": operator.gt, "<": operator.lt
+}
+
+# Поля фильтра API, которые есть в KeywordRecord: условия на них можно проверить локально
+_LOCAL_FIELDS = dict({field: field for field in KeywordRecord.FIELDS}, destination_key="word")
+
+
+class StopWordMatcher:
+    AUTOMATON_THRESHOLD = 32
+
+    def __init__(self, stop_words: Optional[Iterable[str]]):
+        self.words = tuple(sorted({
+            word.strip().lower() for word in stop_words or [] if word and word.strip()
+        }))
+        self._delta = None
+        self._terminal = None
+        if len(self.words) > self.AUTOMATON_THRESHOLD:
+            self._build_automaton()
+
+    def _build_automaton(self):
+        goto = [{}]
+        terminal = [False]
+        for word in self.words:
+            state = 0
+            for ch in word:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    terminal.append(False)
+                state = nxt
+            terminal[state] = True
+
+        fail = [0] * len(goto)
+        delta = [dict(goto[0])]
+        delta.extend({} for _ in range(len(goto) - 1))
+        queue = list(goto[0].values())
+        for state in queue:
+            terminal[state] = terminal[state] or terminal[fail[state]]
+            delta[state] = dict(delta[fail[state]])
+            delta[state].update(goto[state])
+            for ch, nxt in goto[state].items():
+                fail[nxt] = delta[fail[state]].get(ch, 0)
+                queue.append(nxt)
+
+        self._delta = delta
+        self._terminal = terminal
+
+    def search(self, text: str) -> bool:
+        if self._delta is None:
+            for word in self.words:
+                if word in text:
+                    return True
+            return False
+
+        delta = self._delta
+        terminal = self._terminal
+        state = 0
+        for ch in text:
+            state = delta[state].get(ch, 0)
+            if terminal[state]:
+                return True
+        return False
+
+    def __bool__(self) -> bool:
+        return bool(self.words)
+
+
+class Predicate:
+    __slots__ = ("field", "op", "value", "pushdown")
+
+    def __init__(self, field: Optional[str], op: Optional[str], value, pushdown: bool = True):
+        self.field = field
+        self.op = op
+        self.value = value
+        self.pushdown = pushdown
+
+    @classmethod
+    def parse(cls, clause: str) -> "Predicate":
+        match = _CLAUSE_RE.match(clause)
+        if match is None:
+            # Непонятное условие передаем на сервер как есть
+            return cls(None, None, clause.strip())
+        field, op, value = match.groups()
+        return cls(field, op, int(value) if _NUMBER_RE.match(value) else value)
+
+    def to_server(self) -> str:
+        if self.op is None:
+            return self.value
+        return f"{self.field}{self.op}{self.value}"
+
+    def compile(self) -> Optional[Callable[[KeywordRecord], bool]]:
+        attribute = _LOCAL_FIELDS.get(self.field)
+        if attribute is None:
+            return None
+        if self.op in ("LIKE", "NOT LIKE"):
+            text = str(self.value).lower()
+            negate = self.op == "NOT LIKE"
+            return lambda kw: (text in getattr(kw, attribute).lower()) != negate
+        value = self.value
+        if attribute == "word" or not isinstance(value, int):
+            return None
+        compare = _COMPARISONS[self.op]
+        return lambda kw: compare(getattr(kw, attribute), value)
+
+
+class FilterExpression:
+    def __init__(self, predicates: Sequence[Predicate] = ()):
+        self.predicates = list(predicates)
+
+    @classmethod
+    def parse(cls, text: Optional[str]) -> "FilterExpression":
+        return cls(Predicate.parse(clause) for clause in (text or "").split("^") if clause.strip())
+
+    @classmethod
+    def from_config(cls, config, local_thresholds: bool = False) -> "FilterExpression":
+        pushdown = not local_thresholds
+        predicates = [
+            Predicate("numwords", ">=", config.min_num_words, pushdown),
+            Predicate("wsk", "<=", config.wsk_threshold, pushdown)
+        ]
+        if config.ws_threshold:
+            predicates.append(Predicate("ws", "<=", config.ws_threshold))
+        for stop_word in config.stop_words or []:
+            if stop_word.strip():
+                predicates.append(Predicate("destination_key", "NOT LIKE", stop_word.strip(), pushdown))
+        if config.safe_filters:
+            predicates.append(Predicate("isadult", "=", 0))
+        return cls(predicates + cls.parse(config.ad_filters).predicates)
+
+    def server(self) -> str:
+        return "^".join(predicate.to_server() for predicate in self.predicates if predicate.pushdown)
+
+    def mirror(self) -> Callable[[KeywordRecord], bool]:
+        checks = [check for check in (predicate.compile() for predicate in self.predicates) if check is not None]
+        return lambda kw: all(check(kw) for check in checks)
+
+    def local(self) -> "KeywordFilter":
+        min_num_words = None
+        wsk_threshold = None
+        stop_words = []
+        # Локально остаются только пороги и стоп-слова, которые from_config не отправил на сервер
+        for predicate in self.predicates:
+            if predicate.pushdown:
+                continue
+            if predicate.field == "numwords" and predicate.op == ">=":
+                min_num_words = max(min_num_words or 0, predicate.value)
+            elif predicate.field == "wsk" and predicate.op == "<=":
+                wsk_threshold = predicate.value if wsk_threshold is None else min(wsk_threshold, predicate.value)
+            elif _LOCAL_FIELDS.get(predicate.field) == "word" and predicate.op == "NOT LIKE":
+                stop_words.append(str(predicate.value))
+        return KeywordFilter(min_num_words, wsk_threshold, stop_words)
+
+
+class KeywordFilter:
+    def __init__(self, min_num_words: Optional[int], wsk_threshold: Optional[int],
+                 stop_words: Optional[Iterable[str]] = None):
+        self.min_num_words = min_num_words
+        self.wsk_threshold = wsk_threshold
+        self.stop_words = StopWordMatcher(stop_words)
+
+    @classmethod
+    def from_config(cls, config) -> "KeywordFilter":
+        return FilterExpression.from_config(config, local_thresholds=True).local()
+
+    def is_valid(self, text: str) -> bool:
+        if len(text) < 5:
+            return False
+        if _INVALID_CHARS_RE.search(text):
+            return False
+        words = text.split()
+        return len(set(words)) >= len(words) * 0.5
+
+    def matches(self, kw: KeywordRecord) -> bool:
+        if self.min_num_words is not None and kw.numwords < self.min_num_words:
+            return False
+        if self.wsk_threshold is not None and kw.wsk > self.wsk_threshold:
+            return False
+        if self.stop_words.search(kw.word.lower()):
+            return False
+        return self.is_valid(kw.word)
+
+    def filter(self, keywords: Iterable[KeywordRecord]) -> List[KeywordRecord]:
+        min_num_words = self.min_num_words if self.min_num_words is not None else float("-inf")
+        wsk_threshold = self.wsk_threshold if self.wsk_threshold is not None else float("inf")
+        contains_stop_word = self.stop_words.search if self.stop_words else None
+        invalid_chars = _INVALID_CHARS_RE.search
+
+        filtered = []
+        append = filtered.append
+        for kw in keywords:
+            if kw.numwords < min_num_words or kw.wsk > wsk_threshold:
+                continue
+            text = kw.word
+            if len(text) < 5 or invalid_chars(text):
+                continue
+            if contains_stop_word is not None and contains_stop_word(text.lower()):
+                continue
+            words = text.split()
+            if len(set(words)) < len(words) * 0.5:
+                continue
+            append(kw)
+        return filtered
@@ -1,51 +1,107 @@
-import re
-from typing import List, Dict, Set
+import heapq
+import random
+import asyncio
+from collections import deque
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
 from api_client import KeysAPIClient
+from async_api_client import AsyncKeysAPIClient
+from deduplicator import Deduplicator
+from keyword_filter import FilterExpression
+from job_poller import JobPoller
+from rate_limiter import RateLimiter
+from keyword_record import KeywordRecord
+from checkpoint import RunCheckpoint
+from profiler import StageProfiler
+from ranking import TopK
+from seed_store import SeedStore, attribute_suggestions
+from validator import KeywordValidator
 
 
 class KeywordProcessor:
-    def __init__(self, api_client: KeysAPIClient, config):
+    def __init__(self, api_client: KeysAPIClient, config,
+                 async_client: Optional[AsyncKeysAPIClient] = None,
+                 checkpoint: Optional[RunCheckpoint] = None,
+                 profiler: Optional[StageProfiler] = None,
+                 seed_store: Optional[SeedStore] = None):
         self.api = api_client
+        self.metrics = api_client.metrics
         self.config = config
+        self.checkpoint = checkpoint
+        self.profiler = profiler or StageProfiler()
+        self.seed_store = seed_store
+        self.failed_chunks = 0
+        self._compile_filters()
+        # Собственный асинхронный клиент закрываем в close(), общий (пакетный режим) закрывает владелец
+        self._owns_async_api = async_client is None
+        self.async_api = async_client or AsyncKeysAPIClient(
+            api_client,
+            max_concurrency=config.max_concurrency,
+            poller=JobPoller(RateLimiter(max_requests=config.poll_budget, time_window=10))
+        )
+
+    def close(self):
+        if self._owns_async_api:
+            self.async_api.close()
 
-    def process_pipeline(self, seeds: List[str]) -> List[Dict]:
+    def process_pipeline(self, seeds: List[str]) -> List[KeywordRecord]:
+        return asyncio.run(self.process_pipeline_async(seeds))
+
+    async def process_pipeline_async(self, seeds: List[str]) -> List[KeywordRecord]:
         print(f"\n🌱 Начинаем обработку {len(seeds)} семян...")
+        self._compile_filters()
         
         if self.config.offline_mode:
             print("\n🔌 OFFLINE режим: работа без API")
             return self._offline_mode_results(seeds)
         
+        if self.checkpoint is not None:
+            results = self.checkpoint.load_results()
+            if results is not None:
+                print(f"\n♻️ Результаты запуска {self.checkpoint.run_id} уже сохранены: {len(results)} ключей")
+                return results
+        
         if self.config.multi_region:
             print(f"\n🌍 Мульти-регион режим: {len(self.config.regions)} регионов")
-            return self._multi_region_pipeline(seeds)
         
-        return self._single_region_pipeline(seeds)
+        if self.seed_store is not None:
+            return await self._process_incremental(seeds)
+        
+        with self.profiler.stage("suggest"):
+            all_keywords = await self._collect_keywords(seeds)
+        return await self._extend_and_clean(all_keywords)
     
-    def _offline_mode_results(self, seeds: List[str]) -> List[Dict]:
+    def _offline_mode_results(self, seeds: List[str]) -> List[KeywordRecord]:
         print(f"\n✅ Сгенерировано {len(seeds)} ключей в offline режиме")
         results = []
         for seed in seeds:
-            results.append({
-                "word": seed,
-                "destination_key": seed,
-                "wsk": 0,
-                "ws": 0,
-                "numwords": len(seed.split()),
-                "isquest": 1 if any(q in seed.lower() for q in ["как", "где", "сколько", "что", "какой"]) else 0,
-                "isgeo": 0,
-                "adscnt": 0,
-                "avbid": 0,
-                "docs": 0,
-                "cnt": 0,
-                "offline": True
-            })
+            results.append(KeywordRecord(
+                seed,
+                numwords=len(seed.split()),
+                isquest=1 if any(q in seed.lower() for q in ["как", "где", "сколько", "что", "какой"]) else 0,
+                offline=True
+            ))
         return results[:self.config.max_results]
     
-    def _multi_region_pipeline(self, seeds: List[str]) -> List[Dict]:
-        all_results = []
+    async def _collect_keywords(self, seeds: List[str]) -> List[str]:
+        if self.checkpoint is not None:
+            saved = self.checkpoint.get("keywords")
+            if saved is not None:
+                print(f"\n♻️ Шаг 1 пропущен: {len(saved)} фраз из контрольной точки")
+                return saved
+        
+        if self.config.multi_region:
+            all_keywords = await self._collect_multi_region(seeds)
+        else:
+            all_keywords = await self._collect_single_region(seeds)
+        self.metrics.add_rows("collected", len(all_keywords))
         
+        if self.checkpoint is not None:
+            self.checkpoint.save("keywords", all_keywords)
+        return all_keywords
+    
+    async def _collect_multi_region(self, seeds: List[str]) -> List[str]:
         print("\n📋 Шаг 1: Получение подсказок по всем регионам...")
-        multi_suggested = self.api.suggest_multi_region(seeds, self.config.regions)
+        multi_suggested = await self.async_api.suggest_multi_region(seeds, self.config.regions)
         
         all_keywords = list(set(seeds))
         for region, suggested in multi_suggested.items():
@@ -54,183 +110,461 @@ class KeywordProcessor:
         
         all_keywords = list(set(all_keywords))
         print(f"   ✓ Всего уникальных: {len(all_keywords)}")
+        return all_keywords
+    
+    async def _collect_single_region(self, seeds: List[str]) -> List[str]:
+        print("\n📋 Шаг 1: Получение быстрых подсказок...")
+        suggested = await self.async_api.suggest(seeds, self.config.region_id)
+        print(f"   ✓ Получено {len(suggested)} подсказок")
         
+        return list(set(seeds + suggested))
+    
+    async def _extend_and_clean(self, all_keywords: List[str]) -> List[KeywordRecord]:
         print(f"\n🔄 Шаг 2: Расширение ключевых фраз...")
-        extended = self._process_extended_keywords(all_keywords)
-        
+        with self.profiler.stage("extend"):
+            extended = await self._process_extended_keywords(all_keywords)
+        return await self._clean_keywords(extended)
+    
+    async def _clean_keywords(self, extended: List[KeywordRecord]) -> List[KeywordRecord]:
         print(f"\n🔍 Шаг 3: Фильтрация и очистка...")
-        filtered = self._filter_keywords(extended)
+        with self.profiler.stage("filter"):
+            filtered = self._filter_keywords(extended)
+        self.metrics.add_rows("filtered", len(filtered))
         print(f"   ✓ После фильтрации: {len(filtered)} ключей")
         
         print(f"\n🎯 Шаг 4: Удаление дублей...")
-        deduplicated = self._deduplicate_keywords(filtered)
+        with self.profiler.stage("dedup"):
+            deduplicated = await self._deduplicate_keywords(filtered)
+        self.metrics.add_rows("deduplicated", len(deduplicated))
+        
+        results = deduplicated[:self.config.max_results]
+        self.metrics.add_rows("results", len(results))
+        if self.checkpoint is not None:
+            if self.failed_chunks:
+                print(f"   ⚠ Не выполнено заданий: {self.failed_chunks}, "
+                      f"догрузить их можно через --resume {self.checkpoint.run_id}")
+            else:
+                self.checkpoint.save_results(results)
         
         print(f"\n✅ Обработка завершена!")
-        return deduplicated[:self.config.max_results]
+        return results
     
-    def _single_region_pipeline(self, seeds: List[str]) -> List[Dict]:
-        print("\n📋 Шаг 1: Получение быстрых подсказок...")
-        suggested = self.api.suggest(seeds, self.config.region_id)
-        print(f"   ✓ Получено {len(suggested)} подсказок")
-        
-        all_keywords = list(set(seeds + suggested))
+    async def _process_incremental(self, seeds: List[str]) -> List[KeywordRecord]:
+        regions = self.config.regions if self.config.multi_region else [self.config.region_id]
+        print(f"\n📋 Шаг 1: Подсказки только для новых семян...")
+        with self.profiler.stage("suggest"):
+            results = await asyncio.gather(
+                *(self._suggest_incremental(seeds, region) for region in regions),
+                return_exceptions=True
+            )
         
-        print(f"\n🔄 Шаг 2: Расширение ключевых фраз...")
-        extended = self._process_extended_keywords(all_keywords)
+        all_keywords = set(seeds)
+        errors = []
+        for region, result in zip(regions, results):
+            if isinstance(result, Exception):
+                print(f"   ⚠ Регион {region}: {result}")
+                errors.append(result)
+                continue
+            all_keywords.update(result)
+        if errors and len(errors) == len(regions):
+            raise errors[0]
+        all_keywords = sorted(all_keywords)
+        self.metrics.add_rows("collected", len(all_keywords))
+        print(f"   ✓ Всего уникальных: {len(all_keywords)}")
         
-        print(f"\n🔍 Шаг 3: Фильтрация и очистка...")
-        filtered = self._filter_keywords(extended)
-        print(f"   ✓ После фильтрации: {len(filtered)} ключей")
+        print(f"\n🔄 Шаг 2: Расширение только новых фраз...")
+        with self.profiler.stage("extend"):
+            extended = await self._extend_incremental(all_keywords)
+        return await self._clean_keywords(extended)
+    
+    async def _suggest_incremental(self, seeds: List[str], region: int) -> Set[str]:
+        stored = self.seed_store.get_suggestions(seeds, region)
+        missing = [seed for seed in dict.fromkeys(seeds) if seed not in stored]
+        print(f"   ♻️ Регион {region}: из хранилища {len(stored)} семян, к запросу {len(missing)}")
+        
+        suggested = set()
+        if missing:
+            keys = await self.async_api.suggest(missing, region)
+            attributed = attribute_suggestions(missing, keys)
+            self.seed_store.put_suggestions(attributed, region)
+            suggested.update(keys)
+        for keys in stored.values():
+            suggested.update(keys)
+        return suggested
+    
+    async def _extend_incremental(self, phrases: List[str]) -> List[KeywordRecord]:
+        filters = self._build_filters()
+        stored = self.seed_store.get_expansions(phrases, self.config.base, filters)
+        missing = [phrase for phrase in phrases if phrase not in stored]
+        print(f"   ♻️ Из хранилища: {len(stored)} фраз, к расширению: {len(missing)}")
+        
+        fetched = []
+        if missing:
+            fetched = await self._process_extended_keywords(missing)
+            expansions = {phrase: [] for phrase in missing}
+            for kw in fetched:
+                records = expansions.get(kw.source_key)
+                if records is not None:
+                    records.append(kw)
+            # Пустой список нельзя отличить от строк, не сопоставленных с source_key
+            # (или потерянных в упавшем задании), поэтому такие фразы не сохраняем
+            expansions = {phrase: records for phrase, records in expansions.items() if records}
+            self.seed_store.put_expansions(expansions, self.config.base, filters)
+        
+        reused = sorted((kw for records in stored.values() for kw in records), key=KeywordRecord.sort_key)
+        extended = self._merge_chunks([reused, fetched])
+        print(f"   ✓ Всего ключей: {len(extended)} (повторно использовано {len(reused)})")
+        return extended
+    
+    async def stream_pipeline(self, seeds: List[str]) -> AsyncIterator[List[KeywordRecord]]:
+        print(f"\n🌱 Начинаем потоковую обработку {len(seeds)} семян...")
+        self._compile_filters()
         
-        print(f"\n🎯 Шаг 4: Удаление дублей...")
-        deduplicated = self._deduplicate_keywords(filtered)
+        if self.config.offline_mode:
+            print("\n🔌 OFFLINE режим: работа без API")
+            yield self._offline_mode_results(seeds)
+            return
         
+        if self.config.multi_region:
+            print(f"\n🌍 Мульти-регион режим: {len(self.config.regions)} регионов")
+        with self.profiler.stage("suggest"):
+            all_keywords = await self._collect_keywords(seeds)
+        
+        if self.config.dedup_mode != "local":
+            print("   ⚠ В потоковом режиме дубли удаляются только локально")
+        
+        print(f"\n🔄 Шаг 2-4: Расширение, фильтрация и удаление дублей на лету...")
+        deduplicator = Deduplicator(stemming=self.config.dedup_stemming)
+        limit = self.config.max_results
+        # До записи строка ждет, пока все незавершенные задания не уйдут дальше нее по sort_key,
+        # поэтому в файлы попадает тот же топ, что и в обычном режиме, а в памяти не больше limit строк
+        ranking = TopK(limit)
+        loaded = 0
+        emitted = 0
+        pages = self._stream_extended_keywords(all_keywords)
+        try:
+            async for safe, page in pages:
+                loaded += len(page)
+                filtered = self.keyword_filter.filter(page)
+                self.metrics.add_rows("filtered", len(filtered))
+                fresh = deduplicator.unseen(filtered)
+                self.metrics.add_rows("deduplicated", len(fresh))
+                ranking.add(fresh)
+                batch = ranking.pop_until(safe)
+                if batch:
+                    emitted += len(batch)
+                    yield batch
+                if emitted >= limit:
+                    print(f"   ✓ Достигнут лимит {limit} ключей")
+                    break
+        finally:
+            await pages.aclose()
+        
+        self.metrics.add_rows("results", emitted)
+        print(f"   ✓ Загружено {loaded} ключей, после фильтрации и дублей: {emitted}")
         print(f"\n✅ Обработка завершена!")
-        return deduplicated[:self.config.max_results]
     
-    def _process_extended_keywords(self, keywords: List[str]) -> List[Dict]:
-        uid = self.api.create_extended_keywords(
-            base=self.config.base,
-            keywords=keywords,
-            similarity=30,
-            delete_duplicate=True,
-            additions=True
+    async def _process_extended_keywords(self, keywords: List[str]) -> List[KeywordRecord]:
+        keywords = sorted(keywords)
+        chunk_size = self.config.extended_chunk_size
+        chunks = [keywords[i:i + chunk_size] for i in range(0, len(keywords), chunk_size)]
+        if len(chunks) > 1:
+            print(f"   ✓ Фразы разбиты на {len(chunks)} заданий по {chunk_size}")
+        
+        results = await asyncio.gather(
+            *(self._process_extended_chunk(index, chunk) for index, chunk in enumerate(chunks, 1)),
+            return_exceptions=True
         )
         
-        if not uid:
-            raise Exception("❌ Не удалось создать задание на расширение")
+        pages = []
+        self.failed_chunks = 0
+        for index, result in enumerate(results, 1):
+            if isinstance(result, Exception):
+                print(f"   ⚠ Задание {index}/{len(chunks)} не выполнено: {result}")
+                self.failed_chunks += 1
+                continue
+            pages.append(result)
         
-        print(f"   ✓ Задание создано: {uid}")
-        self.api.wait_for_extended_keywords(uid)
+        if not pages:
+            raise Exception("❌ Не удалось выполнить ни одно задание на расширение")
         
-        print("\n📥 Загрузка расширенных ключей...")
-        extended = self._fetch_all_keywords(uid)
+        extended = self._merge_chunks(pages)
         print(f"   ✓ Загружено {len(extended)} ключей")
         
         return extended
     
-    def _deduplicate_keywords(self, keywords: List[Dict]) -> List[Dict]:
-        words_only = [kw.get("destination_key") or kw.get("word", "") for kw in keywords]
-        deduplicated_words = self.api.delete_doubles(words_only)
+    async def _process_extended_chunk(self, index: int, keywords: List[str]) -> List[KeywordRecord]:
+        retries = self.config.chunk_retries
+        for attempt in range(retries + 1):
+            try:
+                uid = await self._resume_extended_job(index, keywords, attempt)
+                if uid is None:
+                    uid = await self._start_extended_job(keywords, use_cache=attempt == 0)
+                    if self.checkpoint is not None:
+                        self.checkpoint.start_job(index, keywords, uid)
+                print(f"\n📥 Загрузка расширенных ключей ({uid})...")
+                return await self._fetch_all_keywords(uid, index, keywords)
+            except Exception as e:
+                if attempt >= retries:
+                    raise
+                wait_time = 2 ** attempt
+                print(f"   ⚠ Задание {index}: {e}. Повтор через {wait_time} сек...")
+                await asyncio.sleep(wait_time)
+    
+    async def _stream_extended_keywords(self, keywords: List[str]) -> AsyncIterator[Tuple[Tuple, List[KeywordRecord]]]:
+        keywords = sorted(keywords)
+        chunk_size = self.config.extended_chunk_size
+        chunks = [keywords[i:i + chunk_size] for i in range(0, len(keywords), chunk_size)]
+        if len(chunks) > 1:
+            print(f"   ✓ Фразы разбиты на {len(chunks)} заданий по {chunk_size}")
+        
+        queue = asyncio.Queue(maxsize=self.config.max_concurrency * 2)
+        # Страницы задания приходят по возрастанию sort_key: граница задания - ключ его последней строки
+        frontiers = {index: (float("-inf"),) for index in range(1, len(chunks) + 1)}
+        
+        async def produce(index: int, chunk: List[str]) -> bool:
+            try:
+                await self._stream_extended_chunk(index, chunk, queue)
+                done = True
+            except Exception as e:
+                print(f"   ⚠ Задание {index}/{len(chunks)} не выполнено: {e}")
+                done = False
+            await queue.put((index, None))
+            return done
+        
+        async def produce_all() -> List[bool]:
+            results = await asyncio.gather(*(produce(index, chunk) for index, chunk in enumerate(chunks, 1)))
+            await queue.put(None)
+            return results
+        
+        producer = asyncio.ensure_future(produce_all())
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                index, page = item
+                if page is None:
+                    frontiers.pop(index, None)
+                    page = []
+                elif page:
+                    frontiers[index] = max(frontiers[index], page[-1].sort_key())
+                yield min(frontiers.values(), default=(float("inf"),)), page
+        finally:
+            if not producer.done():
+                producer.cancel()
+                await asyncio.gather(producer, return_exceptions=True)
+        
+        if not any(producer.result()):
+            raise Exception("❌ Не удалось выполнить ни одно задание на расширение")
+    
+    async def _stream_extended_chunk(self, index: int, keywords: List[str], queue: asyncio.Queue):
+        retries = self.config.chunk_retries
+        for attempt in range(retries + 1):
+            try:
+                uid = await self._start_extended_job(keywords, use_cache=attempt == 0)
+                print(f"\n📥 Потоковая загрузка расширенных ключей ({uid})...")
+                pages = self._iter_pages(uid)
+                try:
+                    async for _, _, page in pages:
+                        await queue.put((index, page))
+                finally:
+                    await pages.aclose()
+                return
+            except Exception as e:
+                if attempt >= retries:
+                    raise
+                wait_time = 2 ** attempt
+                print(f"   ⚠ Задание {index}: {e}. Повтор через {wait_time} сек...")
+                await asyncio.sleep(wait_time)
+    
+    async def _resume_extended_job(self, index: int, keywords: List[str], attempt: int) -> Optional[str]:
+        if self.checkpoint is None:
+            return None
+        
+        job = self.checkpoint.job(index, keywords)
+        uid = job.get("uid")
+        if not uid or (attempt > 0 and not job["pages"]):
+            return None
+        
+        if job["done"]:
+            print(f"   ♻️ Задание {index}: все страницы уже загружены ({uid})")
+            return uid
+        
+        if not await self.async_api.extended_keywords_exists(uid):
+            print(f"   ⚠ Задание {uid} больше недоступно на сервере, создаем заново...")
+            return None
+        
+        print(f"   ♻️ Задание {index}: продолжаем {uid}, загружено страниц: {len(job['pages'])}")
+        await self.async_api.wait_for_extended_keywords(uid, max_wait=self.config.job_timeout)
+        return uid
+    
+    async def _start_extended_job(self, keywords: List[str], use_cache: bool = True) -> str:
+        uid = await self._create_extended_job(keywords, use_cache=use_cache)
+        
+        if uid and use_cache and self.api.cache is not None and not await self.async_api.extended_keywords_exists(uid):
+            print("   ⚠ Задание из кеша больше недоступно, создаем заново...")
+            uid = await self._create_extended_job(keywords, use_cache=False)
+        
+        if not uid:
+            raise Exception("❌ Не удалось создать задание на расширение")
+        
+        print(f"   ✓ Задание создано: {uid}")
+        await self.async_api.wait_for_extended_keywords(uid, max_wait=self.config.job_timeout)
+        return uid
+    
+    def _merge_chunks(self, pages: List[List[KeywordRecord]]) -> List[KeywordRecord]:
+        if len(pages) == 1:
+            return pages[0]
+        
+        with self.profiler.stage("merge"):
+            return self._merge_sorted(pages)
+    
+    def _merge_sorted(self, pages: List[List[KeywordRecord]]) -> List[KeywordRecord]:
+        merged = []
+        seen = set()
+        for kw in heapq.merge(*pages, key=KeywordRecord.sort_key):
+            if kw.word in seen:
+                continue
+            seen.add(kw.word)
+            merged.append(kw)
+        return merged
+    
+    async def _create_extended_job(self, keywords: List[str], use_cache: bool = True) -> Optional[str]:
+        return await self.async_api.create_extended_keywords(
+            base=self.config.base,
+            keywords=keywords,
+            similarity=30,
+            delete_duplicate=True,
+            additions=True,
+            use_cache=use_cache
+        )
+    
+    async def _deduplicate_keywords(self, keywords: List[KeywordRecord]) -> List[KeywordRecord]:
+        mode = self.config.dedup_mode
+        if mode == "local":
+            deduplicated = Deduplicator(stemming=self.config.dedup_stemming).deduplicate(keywords)
+            print(f"   ✓ После дедупликации: {len(deduplicated)} ключей")
+            return deduplicated
+        
+        words_only = [kw.word for kw in keywords]
+        deduplicated_words = await self.async_api.delete_doubles(words_only)
         
         deduplicated = []
         dedup_set = set(deduplicated_words)
         for kw in keywords:
-            word = kw.get("destination_key") or kw.get("word", "")
-            if word in dedup_set:
+            if kw.word in dedup_set:
                 deduplicated.append(kw)
-                dedup_set.discard(word)
+                dedup_set.discard(kw.word)
+        
+        if mode == "check":
+            local_words = Deduplicator(compat=True).deduplicate_words(words_only)
+            diff = Deduplicator.compare(local_words, deduplicated_words)
+            print(f"   🔎 Сверка с API: локально {diff['local']}, API {diff['server']}, "
+                  f"только локально {diff['only_local']}, только в API {diff['only_server']}")
         
         print(f"   ✓ После дедупликации: {len(deduplicated)} ключей")
         return deduplicated
 
-    def _fetch_all_keywords(self, uid: str) -> List[Dict]:
-        all_keywords = []
-        page = 1
-        per_page = 100
-        
+    async def _fetch_all_keywords(self, uid: str, index: int = 0,
+                                  keywords: Optional[List[str]] = None) -> List[KeywordRecord]:
+        checkpoint = self.checkpoint
+        job = checkpoint.job(index, keywords) if checkpoint is not None else {}
+        pages = {page: checkpoint.load_page(index, page) for page in job.get("pages", [])}
+        
+        if not job.get("done"):
+            async for page, last_page, records in self._iter_pages(uid, set(pages), job.get("last_page")):
+                pages[page] = records
+                if checkpoint is not None:
+                    checkpoint.save_page(index, page, last_page, records)
+            if checkpoint is not None:
+                checkpoint.finish_job(index)
+        
+        return [kw for page in sorted(pages) for kw in pages[page]]
+    
+    async def _iter_pages(self, uid: str, skip: Set[int] = frozenset(),
+                          last_page: Optional[int] = None) -> AsyncIterator[Tuple[int, int, List[KeywordRecord]]]:
         filters = self._build_filters()
+        sort = "wsk|asc,numwords|desc"
+        per_page = KeysAPIClient.MAX_PER_PAGE
         
-        while True:
-            result = self.api.get_extended_keywords(
+        def fetch(page: int):
+            return asyncio.ensure_future(self.async_api.get_extended_keywords(
                 uid=uid,
                 page=page,
                 per_page=per_page,
                 filters=filters,
-                sort="wsk|asc,numwords|desc"
-            )
-            
-            data = result.get("data", [])
+                sort=sort
+            ))
+        
+        if last_page is None or 1 not in skip:
+            first = await fetch(1)
+            data = first.get("data", [])
             if not data:
-                break
+                return
             
-            all_keywords.extend(data)
-            
-            if len(data) < per_page:
-                break
-            
-            page += 1
-        
-        return all_keywords
-
-    def _build_filters(self) -> str:
-        filters = []
-        
-        filters.append(f"numwords>={self.config.min_num_words}")
-        filters.append(f"wsk<={self.config.wsk_threshold}")
-        
-        if self.config.ws_threshold:
-            filters.append(f"ws<={self.config.ws_threshold}")
-        
-        for stop_word in self.config.stop_words:
-            if stop_word.strip():
-                filters.append(f"destination_keyNOT LIKE{stop_word.strip()}")
-        
-        if self.config.safe_filters:
-            filters.append("isadult=0")
-        
-        if self.config.ad_filters:
-            filters.append(self.config.ad_filters)
-        
-        return "^".join(filters)
+            total = int(first.get("total") or len(data))
+            per_page = int(first.get("per_page") or len(data))
+            last_page = int(first.get("last_page") or -(-total // per_page))
+            if 1 not in skip:
+                self.metrics.add_rows("downloaded", len(data))
+                yield 1, last_page, [KeywordRecord.from_api(row) for row in data]
+            if last_page > 1:
+                print(f"   ✓ Всего {total} ключей, страниц: {last_page}")
+        
+        remaining = deque(page for page in range(2, last_page + 1) if page not in skip)
+        window = self.async_api.max_concurrency
+        pending = deque()
+        try:
+            while pending or remaining:
+                while remaining and len(pending) < window:
+                    page = remaining.popleft()
+                    pending.append((page, fetch(page)))
+                page, task = pending.popleft()
+                result = await task
+                data = result.get("data", [])
+                self.metrics.add_rows("downloaded", len(data))
+                yield page, last_page, [KeywordRecord.from_api(row) for row in data]
+        finally:
+            for _, task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*(task for _, task in pending), return_exceptions=True)
 
-    def _filter_keywords(self, keywords: List[Dict]) -> List[Dict]:
-        filtered = []
-        
-        for kw in keywords:
-            word = kw.get("destination_key") or kw.get("word", "")
-            numwords = kw.get("numwords", 0)
-            wsk = kw.get("wsk", 999999)
-            
-            if numwords < self.config.min_num_words:
-                continue
-            
-            if wsk > self.config.wsk_threshold:
-                continue
-            
-            if self._contains_stop_words(word):
-                continue
-            
-            if not self._is_valid_keyword(word):
-                continue
-            
-            filtered.append(kw)
-        
-        return filtered
+    def _compile_filters(self):
+        # В инкрементальном режиме слова, WSK и стоп-слова проверяются только локально,
+        # чтобы сохраненные расширения оставались пригодны при смене этих порогов
+        self.filters = FilterExpression.from_config(self.config, local_thresholds=self.seed_store is not None)
+        self.keyword_filter = self.filters.local()
 
-    def _contains_stop_words(self, text: str) -> bool:
-        text_lower = text.lower()
-        for stop_word in self.config.stop_words:
-            if stop_word.strip() and stop_word.strip().lower() in text_lower:
-                return True
-        return False
+    def _build_filters(self) -> str:
+        return self.filters.server()
 
-    def _is_valid_keyword(self, text: str) -> bool:
-        if len(text) < 5:
-            return False
-        
-        if re.search(r'[^\w\s\-]', text):
-            return False
-        
-        words = text.split()
-        if len(set(words)) < len(words) * 0.5:
-            return False
-        
-        return True
+    def _filter_keywords(self, keywords: List[KeywordRecord]) -> List[KeywordRecord]:
+        return self.keyword_filter.filter(keywords)
 
-    def sample_validation(self, keywords: List[Dict], sample_size: int = 5):
-        import random
-        
-        if len(keywords) < sample_size:
-            sample_size = len(keywords)
-        
-        sample = random.sample(keywords, sample_size)
-        
-        print(f"\n🔬 Валидация выборки ({sample_size} ключей):")
-        for kw in sample:
-            word = kw.get("destination_key") or kw.get("word", "")
-            dashboard = self.api.get_keyword_dashboard(self.config.base, word)
-            if dashboard:
-                print(f"   ✓ '{word}' - существует в базе")
-            else:
-                print(f"   ⚠ '{word}' - не найден")
+    def sample_validation(self, keywords: List[KeywordRecord], sample_size: Optional[int] = None) -> Dict:
+        if sample_size and sample_size < len(keywords):
+            keywords = random.sample(keywords, sample_size)
+        
+        print(f"\n🔬 Валидация {len(keywords)} ключей:")
+        validator = KeywordValidator(self.async_api, self.config.base, timeout=self.config.job_timeout)
+        report = asyncio.run(validator.validate(keywords))
+        self.metrics.add_rows("validated", report["found"])
+        
+        print(f"   ✓ Найдено в базе: {report['found']}/{report['checked']} "
+              f"({report['coverage']:.0%}): списком {report['from_list']}, "
+              f"через дашборд {report['from_dashboard']}")
+        if report["changed_wsk"]:
+            print(f"   ↕ Частотность изменилась у {report['changed_wsk']} ключей")
+        age = report["freshness"]
+        if age["dated"]:
+            print(f"   📅 Давность данных: медиана {age['median_days']} дн., максимум {age['max_days']} дн.")
+        if report["unverified"]:
+            print(f"   ⚠ Не удалось проверить: {report['unverified']} ключей")
+        missing = [row["word"] for row in report["keywords"] if row["found"] is False]
+        for word in missing[:10]:
+            print(f"   ⚠ '{word}' - не найден")
+        if len(missing) > 10:
+            print(f"   ⚠ ... и еще {len(missing) - 10}")
+        return report
@@ -0,0 +1,86 @@
+from typing import Dict, Optional, Tuple
+
+
+class KeywordRecord:
+    FIELDS = ("word", "wsk", "ws", "numwords", "isquest", "isgeo", "adscnt", "avbid", "docs", "cnt")
+    __slots__ = FIELDS + ("source_key", "offline", "_extra_keys", "_extra_values")
+    # Остальные поля API (frequency, maxcpc и т. п.) попадают в JSON-выгрузку как есть. Набор их имен
+    # у всех строк одного ответа одинаков, поэтому кортеж имен общий, а в записи хранятся только значения
+    KNOWN_KEYS = frozenset(FIELDS + ("destination_key", "source_key", "offline"))
+    _extra_names: Dict[Tuple[str, ...], Optional[Tuple[str, ...]]] = {}
+
+    def __init__(self, word: str, wsk: int = 0, ws: int = 0, numwords: int = 0,
+                 isquest: int = 0, isgeo: int = 0, adscnt: int = 0, avbid: int = 0,
+                 docs: int = 0, cnt: int = 0, source_key: str = "", offline: bool = False,
+                 extra: Optional[Dict] = None):
+        self.word = word
+        self.wsk = wsk
+        self.ws = ws
+        self.numwords = numwords
+        self.isquest = isquest
+        self.isgeo = isgeo
+        self.adscnt = adscnt
+        self.avbid = avbid
+        self.docs = docs
+        self.cnt = cnt
+        self.source_key = source_key
+        self.offline = offline
+        self._extra_keys = self._extra_values = None
+        names = self._names(tuple(extra)) if extra else None
+        if names is not None:
+            self._extra_keys = names
+            self._extra_values = tuple([extra[name] for name in names])
+
+    @classmethod
+    def _names(cls, keys: Tuple[str, ...]) -> Optional[Tuple[str, ...]]:
+        names = cls._extra_names.get(keys)
+        if names is None and keys not in cls._extra_names:
+            names = tuple(key for key in keys if key not in cls.KNOWN_KEYS) or None
+            cls._extra_names[keys] = names
+        return names
+
+    @property
+    def extra(self) -> Optional[Dict]:
+        if self._extra_keys is None:
+            return None
+        return dict(zip(self._extra_keys, self._extra_values))
+
+    @classmethod
+    def from_api(cls, row: Dict) -> "KeywordRecord":
+        get = row.get
+        wsk = get("wsk")
+        record = cls(
+            get("destination_key") or get("word", ""),
+            wsk if wsk is not None else 999999,
+            get("ws") or 0,
+            get("numwords") or 0,
+            get("isquest") or 0,
+            get("isgeo") or 0,
+            get("adscnt") or 0,
+            get("avbid") or 0,
+            get("docs") or 0,
+            get("cnt") or 0,
+            get("source_key") or "",
+            bool(get("offline", False))
+        )
+        names = cls._names(tuple(row))
+        if names is not None:
+            record._extra_keys = names
+            record._extra_values = tuple([row[name] for name in names])
+        return record
+
+    def sort_key(self) -> Tuple[int, int]:
+        return self.wsk, -self.numwords
+
+    def to_dict(self) -> Dict:
+        data = {field: getattr(self, field) for field in self.FIELDS}
+        if self._extra_keys is not None:
+            data.update(zip(self._extra_keys, self._extra_values))
+        if self.source_key:
+            data["source_key"] = self.source_key
+        if self.offline:
+            data["offline"] = True
+        return data
+
+    def __repr__(self) -> str:
+        return f"KeywordRecord({self.word!r}, wsk={self.wsk}, numwords={self.numwords})"
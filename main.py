@@ -1,11 +1,22 @@
+import os
 import sys
+import json
+import asyncio
 import argparse
 from datetime import datetime
 from config import Config
 from api_client import KeysAPIClient
+from rate_limiter import RateLimiter, SharedRateLimiter
+from response_cache import ResponseCache
+from seed_store import SeedStore
+from delta import INDEX_EXTENSION, KeywordIndex
+from checkpoint import RunCheckpoint
+from batch import BatchRunner, load_manifest
 from seed_generator import SeedGenerator
 from keyword_processor import KeywordProcessor
 from exporter import Exporter
+from ranking import StatsAccumulator, TopK, top_k
+from profiler import PROFILE_MODES, StageProfiler
 from interactive import (
     show_menu, select_region, select_settings, 
     get_niche, get_stop_words, confirm_settings
@@ -27,9 +38,43 @@ def main():
     parser.add_argument("--minus", type=str, help="Стоп-слова через запятую")
     parser.add_argument("--top", type=int, default=50, help="Сколько ключей показать в отчете")
     parser.add_argument("--seeds-only", action="store_true", help="Только сгенерировать семена")
+    parser.add_argument("--seeds", type=int, help="Сколько семян сгенерировать (по умолчанию 100)")
+    parser.add_argument("--seed-depth", type=int, choices=[1, 2, 3, 4],
+                       help="Максимум модификаторов в одном семени")
+    parser.add_argument("--seed-fanout", type=int, help="Сколько значений брать из каждого измерения модификаторов")
+    parser.add_argument("--seed-modifiers", type=str, metavar="FILE",
+                       help="JSON со своими модификаторами: intent, location, constraint, question, season")
     parser.add_argument("--offline", action="store_true", help="Offline режим без API")
-    parser.add_argument("--format", type=str, choices=["csv", "json", "both"], default="both", 
+    parser.add_argument("--validate", type=int, metavar="N",
+                       help="Сколько ключей топа проверить по базе (по умолчанию весь топ, 0 - без проверки)")
+    parser.add_argument("--concurrency", type=int, help="Максимум одновременных запросов к API")
+    parser.add_argument("--chunk-size", type=int, help="Сколько фраз отправлять в одно задание на расширение")
+    parser.add_argument("--dedup", type=str, choices=["local", "api", "check"],
+                       help="Удаление дублей: локально, через API или сверка локального результата с API")
+    parser.add_argument("--stemming", action="store_true", help="Учитывать словоформы при локальном удалении дублей")
+    parser.add_argument("--no-cache", action="store_true", help="Не использовать локальный кеш ответов API")
+    parser.add_argument("--refresh", action="store_true", help="Игнорировать кеш и перезаписать его свежими ответами")
+    parser.add_argument("--shared-limit", action="store_true",
+                       help="Делить лимит API между всеми процессами с этим токеном на машине")
+    parser.add_argument("--stream", action="store_true",
+                       help="Потоковый режим: ключи пишутся в файлы по мере загрузки страниц")
+    parser.add_argument("--incremental", action="store_true",
+                       help="Запрашивать у API только новые семена, остальное брать из хранилища прошлых запусков")
+    parser.add_argument("--since", type=str, metavar="EXPORT",
+                       help="Выгружать только новые и изменившиеся ключи относительно прошлой выгрузки или индекса .kidx")
+    parser.add_argument("--resume", type=str, metavar="RUN_ID",
+                       help="Продолжить прерванный запуск с последней сохраненной страницы")
+    parser.add_argument("--batch", type=str, metavar="MANIFEST",
+                       help="Пакетный режим: CSV/JSONL со списком ниш (niche, base, regions, wsk, words, ...)")
+    parser.add_argument("--batch-parallel", type=int, help="Сколько ниш пакета обрабатывать одновременно")
+    parser.add_argument("--out-dir", type=str, help="Каталог результатов пакетного режима")
+    parser.add_argument("--format", type=str, choices=["csv", "json", "ndjson", "both"], default="both", 
                        help="Формат экспорта")
+    parser.add_argument("--gzip", action="store_true", help="Сжимать файлы экспорта gzip")
+    parser.add_argument("--metrics", type=str, metavar="DIR",
+                       help="Сохранить метрики запуска (JSON и Prometheus textfile) в каталог")
+    parser.add_argument("--profile", type=str, nargs="?", const="time", choices=PROFILE_MODES,
+                       help="Профилирование по этапам: time, cprofile (+pstats), memory (tracemalloc) или full")
     
     args = parser.parse_args()
     
@@ -60,6 +105,50 @@ def main():
         config.return_top = args.top
     if args.offline:
         config.offline_mode = True
+    if args.validate is not None:
+        config.validation_size = args.validate
+    if args.seeds:
+        config.seed_count = args.seeds
+    if args.seed_depth:
+        config.seed_depth = args.seed_depth
+    if args.seed_fanout is not None:
+        config.seed_fanout = args.seed_fanout
+    if args.seed_modifiers:
+        config.seed_modifiers = args.seed_modifiers
+    if args.concurrency:
+        config.max_concurrency = args.concurrency
+    if args.chunk_size:
+        config.extended_chunk_size = args.chunk_size
+    if args.dedup:
+        config.dedup_mode = args.dedup
+    if args.stemming:
+        config.dedup_stemming = True
+    if args.no_cache:
+        config.cache_enabled = False
+    if args.refresh:
+        config.cache_refresh = True
+    if args.shared_limit:
+        config.shared_rate_limit = True
+    if args.stream:
+        config.stream_mode = True
+    if args.incremental:
+        config.incremental = True
+    if args.since:
+        config.since = args.since
+    if args.gzip:
+        config.export_gzip = True
+    if args.resume:
+        config.resume_run = args.resume
+    if args.batch_parallel:
+        config.batch_parallel = args.batch_parallel
+    if args.metrics:
+        config.metrics_dir = args.metrics
+    if args.profile:
+        config.profile_mode = args.profile
+    
+    if args.batch:
+        run_batch(config, args.batch, args.out_dir, args.format)
+        return
     
     run_processing(config, args.seeds_only, args.format)
 
@@ -107,7 +196,88 @@ def run_interactive_mode():
     run_processing(config, seeds_only=False, export_format="both")
 
 
+def create_api_client(config) -> KeysAPIClient:
+    cache = None
+    if config.cache_enabled:
+        cache = ResponseCache(
+            config.cache_path,
+            ttl=config.cache_ttl,
+            max_size_mb=config.cache_max_mb,
+            refresh=config.cache_refresh
+        )
+    if config.shared_rate_limit:
+        rate_limiter = SharedRateLimiter(
+            config.api_token, max_requests=10, time_window=10, burst=config.rate_limit_burst
+        )
+    else:
+        rate_limiter = RateLimiter(max_requests=10, time_window=10, burst=config.rate_limit_burst)
+    return KeysAPIClient(config.api_token, cache=cache, rate_limiter=rate_limiter, base_url=config.api_base_url)
+
+
+def export_metrics(api_client, config, name):
+    if not config.metrics_dir:
+        return
+    metrics = api_client.metrics
+    json_path = os.path.join(config.metrics_dir, f"metrics_{name}.json")
+    metrics.write_json(json_path)
+    metrics.write_prometheus(os.path.join(config.metrics_dir, "keyshunter.prom"), {"base": config.base})
+    print(f"📈 Метрики сохранены: {json_path}")
+
+
+def run_batch(config, manifest_path, out_dir=None, export_format="both"):
+    try:
+        rows = load_manifest(manifest_path)
+    except Exception as e:
+        print(e)
+        sys.exit(1)
+    
+    if not config.offline_mode and not config.api_token:
+        print("❌ Ошибка конфигурации: API_TOKEN обязателен (или включите OFFLINE_MODE=1)")
+        sys.exit(1)
+    
+    unsupported = [name for name, enabled in (("--stream (STREAM_MODE)", config.stream_mode),
+                                              ("--profile (PROFILE)", config.profile_mode)) if enabled]
+    if unsupported:
+        print(f"❌ Пакетный режим не поддерживает {', '.join(unsupported)}")
+        sys.exit(1)
+    
+    out_dir = out_dir or f"batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    print("=" * 80)
+    print(f"📦 KEYWORD HUNTER: пакет из {len(rows)} ниш → {out_dir}")
+    print(f"Одновременно ниш: {config.batch_parallel} · запросов: {config.max_concurrency}")
+    print("=" * 80)
+    
+    api_client = KeysAPIClient("") if config.offline_mode else create_api_client(config)
+    seed_store = SeedStore.from_config(config) if config.incremental and not config.offline_mode else None
+    runner = BatchRunner(api_client, config, out_dir, export_format, parallel=config.batch_parallel,
+                         seed_store=seed_store)
+    results = runner.run(rows)
+    
+    if api_client.cache is not None:
+        stats = api_client.cache.stats()
+        print(f"💾 Кеш API: попаданий {stats['hits']}, промахов {stats['misses']}")
+    if api_client.coalesced:
+        print(f"🔗 Одинаковых запросов объединено: {api_client.coalesced} (сэкономлено слотов лимита)")
+    export_metrics(api_client, config, f"batch_{os.path.basename(os.path.normpath(out_dir))}")
+    
+    if not any(result["status"] == "ok" for result in results):
+        sys.exit(1)
+
+
 def run_processing(config, seeds_only=False, export_format="both"):
+    checkpoint = None
+    if config.resume_run:
+        try:
+            checkpoint = RunCheckpoint.resume(config.resume_run, config.runs_dir)
+        except Exception as e:
+            print(e)
+            sys.exit(1)
+        checkpoint.restore_config(config)
+        print(f"♻️ Продолжаем запуск {checkpoint.run_id}")
+        if config.stream_mode:
+            print("⚠️ Потоковый режим не поддерживает --resume, используется обычный")
+            config.stream_mode = False
+    
     try:
         config.validate()
     except ValueError as e:
@@ -127,8 +297,35 @@ def run_processing(config, seeds_only=False, export_format="both"):
         print("🔌 OFFLINE РЕЖИМ: без обращения к API")
     print("=" * 80)
     
-    generator = SeedGenerator(config.niche, config.seed_targets)
-    seeds = generator.generate(count=100)
+    profiler = StageProfiler(config.profile_mode)
+    profiler.start()
+    try:
+        process_run(config, checkpoint, profiler, seeds_only, export_format)
+    finally:
+        finish_profile(profiler, config)
+
+
+def finish_profile(profiler, config):
+    if not profiler.enabled:
+        return
+    profiler.stop()
+    path = profiler.save(config.profile_dir, f"{config.base}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+    print("\n⏱ ПРОФИЛЬ ЗАПУСКА:")
+    print(profiler.report())
+    print(f"💾 Профиль сохранен: {path}")
+
+
+def process_run(config, checkpoint, profiler, seeds_only, export_format):
+    with profiler.stage("seeds"):
+        if checkpoint is not None and checkpoint.get("seeds"):
+            seeds = checkpoint.get("seeds")
+        else:
+            try:
+                generator = SeedGenerator.from_config(config)
+            except ValueError as e:
+                print(e)
+                sys.exit(1)
+            seeds = generator.generate(count=config.seed_count)
     
     print(f"\n✅ Сгенерировано {len(seeds)} семян")
     
@@ -140,43 +337,148 @@ def run_processing(config, seeds_only=False, export_format="both"):
     
     if config.offline_mode:
         print("\n🔌 Offline режим: пропускаем API запросы")
-        processor = KeywordProcessor(KeysAPIClient(""), config)
+        processor = KeywordProcessor(KeysAPIClient(""), config, profiler=profiler)
     else:
-        api_client = KeysAPIClient(config.api_token)
-        processor = KeywordProcessor(api_client, config)
+        api_client = create_api_client(config)
+        if not config.stream_mode:
+            if checkpoint is None:
+                checkpoint = RunCheckpoint(config.runs_dir)
+                checkpoint.save_config(config)
+                checkpoint.save("seeds", seeds)
+            print(f"\n🗂 Контрольные точки: {checkpoint.directory} (продолжить: --resume {checkpoint.run_id})")
+        seed_store = None
+        if config.incremental:
+            if config.stream_mode:
+                print("⚠️ Потоковый режим не поддерживает --incremental, хранилище семян не используется")
+            else:
+                seed_store = SeedStore.from_config(config)
+        processor = KeywordProcessor(api_client, config, checkpoint=checkpoint, profiler=profiler,
+                                     seed_store=seed_store)
+    profiler.metrics = processor.api.metrics
+    try:
+        run_pipeline(processor, seeds, config, checkpoint, profiler, export_format)
+    finally:
+        processor.close()
+    # Результаты уже выгружены, продолжать нечего
+    if checkpoint is not None:
+        checkpoint.remove()
+
+
+def run_pipeline(processor, seeds, config, checkpoint, profiler, export_format):
+    delta = load_delta(config)
     
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    base_filename = f"keywords_{config.base}_{timestamp}"
     try:
-        keywords = processor.process_pipeline(seeds)
+        with profiler.stage("pipeline"):
+            if config.stream_mode:
+                top, stats = run_streaming(processor, seeds, config, base_filename, export_format, delta)
+            else:
+                keywords = processor.process_pipeline(seeds)
     except Exception as e:
         print(f"\n❌ Ошибка обработки: {e}")
+        export_metrics(processor.api, config, f"{config.base}_{timestamp}")
+        if checkpoint is not None:
+            print(f"♻️ Продолжить с места остановки: python main.py --resume {checkpoint.run_id}")
         sys.exit(1)
     
-    if not keywords:
-        print("\n⚠️ Не найдено подходящих ключевых фраз")
-        return
+    if processor.api.cache is not None:
+        cache_stats = processor.api.cache.stats()
+        print(f"\n💾 Кеш API: попаданий {cache_stats['hits']}, промахов {cache_stats['misses']}")
+    if processor.api.coalesced:
+        print(f"🔗 Одинаковых запросов объединено: {processor.api.coalesced} (сэкономлено слотов лимита)")
+    if processor.seed_store is not None:
+        store_stats = processor.seed_store.stats()
+        print(f"♻️ Хранилище семян: подсказки {store_stats['hits']['suggest']}/"
+              f"{store_stats['hits']['suggest'] + store_stats['misses']['suggest']}, "
+              f"расширения {store_stats['hits']['expand']}/"
+              f"{store_stats['hits']['expand'] + store_stats['misses']['expand']} из хранилища")
+    export_metrics(processor.api, config, f"{config.base}_{timestamp}")
     
-    keywords_sorted = sorted(keywords, key=lambda x: (x.get("wsk", 999999), -x.get("numwords", 0)))
+    if delta is not None:
+        if not config.stream_mode:
+            keywords = delta.filter(keywords)
+        finish_delta(delta, base_filename)
     
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    base_filename = f"keywords_{config.base}_{timestamp}"
+    empty_message = "Новых или изменившихся ключей нет" if delta is not None else "Не найдено подходящих ключевых фраз"
+    if not config.stream_mode:
+        if not keywords:
+            print(f"\n⚠️ {empty_message}")
+            return
+        
+        with profiler.stage("export"):
+            for writer in Exporter.open_writers(base_filename, export_format, compress=config.export_gzip):
+                with writer:
+                    writer.write_all(keywords)
+        
+        with profiler.stage("rank"):
+            stats = StatsAccumulator(config.stop_words)
+            stats.add(keywords)
+            top = top_k(keywords, config.return_top)
+    elif not stats.count:
+        print(f"\n⚠️ {empty_message}")
+        return
     
-    if export_format in ["csv", "both"]:
-        Exporter.to_csv(keywords_sorted, f"{base_filename}.csv")
+    with profiler.stage("report"):
+        report = Exporter.generate_report(top, seeds, config, stats=stats)
+        
+        report_filename = f"report_{config.base}_{timestamp}.txt"
+        with open(report_filename, 'w', encoding='utf-8') as f:
+            f.write(report)
+    print(f"💾 Отчет сохранен: {report_filename}")
     
-    if export_format in ["json", "both"]:
-        Exporter.to_json(keywords_sorted, f"{base_filename}.json")
+    print("\n" + report)
     
-    report = Exporter.generate_report(keywords_sorted, seeds, config)
+    if not config.offline_mode and top and config.validation_size != 0:
+        with profiler.stage("validation"):
+            validation = processor.sample_validation(top, sample_size=config.validation_size)
+        validation_filename = f"validation_{config.base}_{timestamp}.json"
+        with open(validation_filename, 'w', encoding='utf-8') as f:
+            json.dump(validation, f, ensure_ascii=False, indent=2)
+        print(f"💾 Результаты проверки сохранены: {validation_filename}")
+
+
+def load_delta(config):
+    if not config.since:
+        return None
+    try:
+        delta = KeywordIndex.load(config.since, config.delta_fields)
+    except ValueError as e:
+        print(e)
+        sys.exit(1)
+    print(f"\n🗂 Дельта относительно {config.since}: известно {len(delta)} ключей")
+    return delta
+
+
+def finish_delta(delta, base_filename):
+    path = base_filename + INDEX_EXTENSION
+    delta.save(path)
+    print(f"\n🆕 Новых ключей: {delta.new}, изменились: {delta.changed}, без изменений: {delta.unchanged}")
+    print(f"🗂 Индекс сохранен: {path} (следующий дельта-запуск: --since {path})")
+
+
+def run_streaming(processor, seeds, config, base_filename, export_format, delta=None):
+    writers = Exporter.open_writers(base_filename, export_format, compress=config.export_gzip, stream=True)
     
-    report_filename = f"report_{config.base}_{timestamp}.txt"
-    with open(report_filename, 'w', encoding='utf-8') as f:
-        f.write(report)
-    print(f"💾 Отчет сохранен: {report_filename}")
+    stats = StatsAccumulator(config.stop_words)
+    ranking = TopK(config.return_top)
     
-    print("\n" + report)
+    async def consume():
+        async for batch in processor.stream_pipeline(seeds):
+            if delta is not None:
+                batch = delta.filter(batch)
+            for writer in writers:
+                writer.write(batch)
+            ranking.add(batch)
+            stats.add(batch)
+    
+    try:
+        asyncio.run(consume())
+    finally:
+        for writer in writers:
+            writer.close()
     
-    if not config.offline_mode and len(keywords_sorted) >= 5:
-        processor.sample_validation(keywords_sorted, sample_size=5)
+    return ranking.result(), stats
 
 
 if __name__ == "__main__":
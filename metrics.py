@@ -0,0 +1,226 @@
+import os
+import re
+import json
+import time
+from bisect import bisect_left
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PROMETHEUS_PREFIX = "keyshunter"
+
+# Идентификаторы заданий: "<hex>" и "<база>:<n>:<hex>" (keywords_by_list)
+_UID = re.compile(r"/(?:\w+:\d+:)?[0-9a-fA-F]{16,}(?=/|$)")
+
+
+def endpoint_label(endpoint: str) -> str:
+    return _UID.sub("/{uid}", endpoint)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: Dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        result = []
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            result.append(("+Inf" if bound == float("inf") else repr(bound), total))
+        return result
+
+    def to_dict(self) -> Dict:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "avg": round(self.sum / self.count, 6) if self.count else 0.0,
+            "buckets": dict(self.cumulative())
+        }
+
+
+class Metrics:
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.lock = Lock()
+        self.started = time.time()
+        self.requests: Dict[Tuple[str, str], int] = {}
+        self.latency: Dict[str, Histogram] = {}
+        self.bytes: Dict[str, int] = {}
+        self.retries: Dict[str, int] = {}
+        self.accepted_waits: Dict[str, int] = {}
+        self.accepted_wait_seconds: Dict[str, float] = {}
+        self.cache: Dict[Tuple[str, str], int] = {}
+        self.rate_limit_waits = 0
+        self.rate_limit_wait_seconds = 0.0
+        self.stage_rows: Dict[str, int] = {}
+        self.coalesced: Dict[str, int] = {}
+
+    def observe_request(self, endpoint: str, status, seconds: float, size: int):
+        endpoint = endpoint_label(endpoint)
+        key = (endpoint, str(status))
+        with self.lock:
+            self.requests[key] = self.requests.get(key, 0) + 1
+            histogram = self.latency.get(endpoint)
+            if histogram is None:
+                histogram = self.latency[endpoint] = Histogram(self.buckets)
+            histogram.observe(seconds)
+            self.bytes[endpoint] = self.bytes.get(endpoint, 0) + size
+
+    def observe_retry(self, endpoint: str):
+        endpoint = endpoint_label(endpoint)
+        with self.lock:
+            self.retries[endpoint] = self.retries.get(endpoint, 0) + 1
+
+    def observe_accepted(self, endpoint: str, delay: float):
+        endpoint = endpoint_label(endpoint)
+        with self.lock:
+            self.accepted_waits[endpoint] = self.accepted_waits.get(endpoint, 0) + 1
+            self.accepted_wait_seconds[endpoint] = self.accepted_wait_seconds.get(endpoint, 0.0) + delay
+
+    def observe_coalesced(self, endpoint: str):
+        endpoint = endpoint_label(endpoint)
+        with self.lock:
+            self.coalesced[endpoint] = self.coalesced.get(endpoint, 0) + 1
+
+    def observe_rate_limit(self, seconds: float):
+        with self.lock:
+            self.rate_limit_waits += 1 if seconds > 0 else 0
+            self.rate_limit_wait_seconds += seconds
+
+    def observe_cache(self, endpoint: str, hit: bool):
+        key = (endpoint_label(endpoint), "hit" if hit else "miss")
+        with self.lock:
+            self.cache[key] = self.cache.get(key, 0) + 1
+
+    def add_rows(self, stage: str, count: int):
+        with self.lock:
+            self.stage_rows[stage] = self.stage_rows.get(stage, 0) + count
+
+    def summary(self) -> Dict:
+        with self.lock:
+            endpoints = {}
+            for (endpoint, status), count in sorted(self.requests.items()):
+                entry = endpoints.setdefault(endpoint, {"requests": 0, "statuses": {}})
+                entry["requests"] += count
+                entry["statuses"][status] = count
+            for endpoint, entry in endpoints.items():
+                entry["latency"] = self.latency[endpoint].to_dict()
+                entry["bytes"] = self.bytes.get(endpoint, 0)
+                entry["retries"] = self.retries.get(endpoint, 0)
+                entry["accepted_waits"] = self.accepted_waits.get(endpoint, 0)
+                entry["accepted_wait_seconds"] = round(self.accepted_wait_seconds.get(endpoint, 0.0), 3)
+            for endpoint, count in self.coalesced.items():
+                endpoints.setdefault(endpoint, {"requests": 0, "statuses": {}})["coalesced"] = count
+
+            cache = {}
+            for (endpoint, result), count in sorted(self.cache.items()):
+                cache.setdefault(endpoint, {"hit": 0, "miss": 0})[result] = count
+
+            return {
+                "started": self.started,
+                "seconds": round(time.time() - self.started, 3),
+                "requests": sum(self.requests.values()),
+                "bytes": sum(self.bytes.values()),
+                "retries": sum(self.retries.values()),
+                "accepted_waits": sum(self.accepted_waits.values()),
+                "coalesced": sum(self.coalesced.values()),
+                "rate_limit": {
+                    "waits": self.rate_limit_waits,
+                    "seconds": round(self.rate_limit_wait_seconds, 3)
+                },
+                "cache": cache,
+                "rows": dict(self.stage_rows),
+                "endpoints": endpoints
+            }
+
+    def to_prometheus(self, labels: Optional[Dict] = None) -> str:
+        labels = labels or {}
+        p = PROMETHEUS_PREFIX
+        lines = []
+
+        def family(name: str, kind: str, help_text: str, samples):
+            lines.append(f"# HELP {p}_{name} {help_text}")
+            lines.append(f"# TYPE {p}_{name} {kind}")
+            for suffix, sample_labels, value in samples:
+                lines.append(f"{p}_{name}{suffix}{_labels(dict(labels, **sample_labels))} {value}")
+
+        with self.lock:
+            family("api_requests_total", "counter", "API responses by endpoint and status", [
+                ("", {"endpoint": endpoint, "status": status}, count)
+                for (endpoint, status), count in sorted(self.requests.items())
+            ])
+            histogram_samples = []
+            for endpoint, histogram in sorted(self.latency.items()):
+                for bound, count in histogram.cumulative():
+                    histogram_samples.append(("_bucket", {"endpoint": endpoint, "le": bound}, count))
+                histogram_samples.append(("_sum", {"endpoint": endpoint}, repr(histogram.sum)))
+                histogram_samples.append(("_count", {"endpoint": endpoint}, histogram.count))
+            family("api_request_duration_seconds", "histogram", "API request latency", histogram_samples)
+            family("api_response_bytes_total", "counter", "Response bytes received", [
+                ("", {"endpoint": endpoint}, size) for endpoint, size in sorted(self.bytes.items())
+            ])
+            family("api_retries_total", "counter", "Repeated request attempts", [
+                ("", {"endpoint": endpoint}, count) for endpoint, count in sorted(self.retries.items())
+            ])
+            family("api_accepted_waits_total", "counter", "202 responses waited out", [
+                ("", {"endpoint": endpoint}, count) for endpoint, count in sorted(self.accepted_waits.items())
+            ])
+            family("api_accepted_wait_seconds_total", "counter", "Time slept after 202 responses", [
+                ("", {"endpoint": endpoint}, repr(seconds))
+                for endpoint, seconds in sorted(self.accepted_wait_seconds.items())
+            ])
+            family("api_coalesced_total", "counter", "Requests answered by an identical in-flight request", [
+                ("", {"endpoint": endpoint}, count) for endpoint, count in sorted(self.coalesced.items())
+            ])
+            family("rate_limit_wait_seconds_total", "counter", "Time blocked in the rate limiter", [
+                ("", {}, repr(self.rate_limit_wait_seconds))
+            ])
+            family("cache_requests_total", "counter", "Response cache lookups", [
+                ("", {"endpoint": endpoint, "result": result}, count)
+                for (endpoint, result), count in sorted(self.cache.items())
+            ])
+            family("stage_rows_total", "counter", "Rows produced by pipeline stages", [
+                ("", {"stage": stage}, count) for stage, count in sorted(self.stage_rows.items())
+            ])
+            family("run_started_timestamp_seconds", "gauge", "Run start time", [
+                ("", {}, repr(self.started))
+            ])
+
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, ensure_ascii=False, indent=2)
+
+    def write_prometheus(self, path: str, labels: Optional[Dict] = None):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus(labels))
+        os.replace(tmp_path, path)
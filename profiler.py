@@ -0,0 +1,98 @@
+import os
+import json
+import time
+import cProfile
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+from metrics import Metrics
+
+
+PROFILE_MODES = ("time", "cprofile", "memory", "full")
+
+
+class StageProfiler:
+    def __init__(self, mode: Optional[str] = None, metrics: Optional[Metrics] = None):
+        self.mode = mode
+        self.enabled = mode is not None
+        self.metrics = metrics
+        self.stages: List[Dict] = []
+        self.profile = cProfile.Profile() if mode in ("cprofile", "full") else None
+        self.trace_memory = mode in ("memory", "full")
+        self._depth = 0
+        self._peaks: List[int] = []
+
+    def start(self):
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if self.profile is not None:
+            self.profile.enable()
+
+    def stop(self):
+        if self.profile is not None:
+            self.profile.disable()
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def _api_seconds(self) -> float:
+        if self.metrics is None:
+            return 0.0
+        return sum(histogram.sum for histogram in list(self.metrics.latency.values()))
+
+    @contextmanager
+    def stage(self, name: str):
+        if not self.enabled:
+            yield
+            return
+
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        if tracing:
+            memory_before, peak_before = tracemalloc.get_traced_memory()
+            if self._peaks:
+                self._peaks[-1] = max(self._peaks[-1], peak_before)
+            if hasattr(tracemalloc, "reset_peak"):
+                tracemalloc.reset_peak()
+            self._peaks.append(0)
+        entry = {"stage": name, "depth": self._depth}
+        self.stages.append(entry)
+        api_before = self._api_seconds()
+        cpu_before = time.process_time()
+        wall_before = time.perf_counter()
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            wall = time.perf_counter() - wall_before
+            cpu = time.process_time() - cpu_before
+            entry.update(
+                wall=round(wall, 4),
+                cpu=round(cpu, 4),
+                wait=round(max(0.0, wall - cpu), 4),
+                api=round(self._api_seconds() - api_before, 4)
+            )
+            if tracing:
+                current, peak = tracemalloc.get_traced_memory()
+                peak = max(peak, self._peaks.pop())
+                if self._peaks:
+                    self._peaks[-1] = max(self._peaks[-1], peak)
+                entry["allocated_mb"] = round((current - memory_before) / 1024 / 1024, 2)
+                entry["peak_mb"] = round(peak / 1024 / 1024, 2)
+
+    def report(self) -> str:
+        lines = [f"{'этап':<24} {'всего, с':>9} {'CPU, с':>8} {'ожидание':>9} {'API, с':>8} {'память МБ':>10} {'пик МБ':>8}"]
+        for entry in self.stages:
+            name = "  " * entry["depth"] + entry["stage"]
+            memory = f"{entry['allocated_mb']:>10.2f} {entry['peak_mb']:>8.2f}" if "peak_mb" in entry else f"{'-':>10} {'-':>8}"
+            lines.append(f"{name:<24} {entry['wall']:>9.3f} {entry['cpu']:>8.3f} {entry['wait']:>9.3f} "
+                         f"{entry['api']:>8.3f} {memory}")
+        return "\n".join(lines)
+
+    def save(self, directory: str, name: str) -> str:
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"profile_{name}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"mode": self.mode, "stages": self.stages}, f, ensure_ascii=False, indent=2)
+        if self.profile is not None:
+            self.profile.dump_stats(os.path.join(directory, f"profile_{name}.pstats"))
+        return path
@@ -0,0 +1,106 @@
+import heapq
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Tuple
+from keyword_filter import StopWordMatcher
+from keyword_record import KeywordRecord
+
+
+class TopK:
+    def __init__(self, k: int):
+        self.k = k
+        self._top: List[KeywordRecord] = []
+
+    def add(self, keywords: Iterable[KeywordRecord]):
+        self._top = heapq.nsmallest(self.k, chain(self._top, keywords), key=KeywordRecord.sort_key)
+
+    def result(self) -> List[KeywordRecord]:
+        return list(self._top)
+
+    def pop_until(self, key: Tuple) -> List[KeywordRecord]:
+        # Забирает из топа строки не дальше key; освобожденные места больше не занимаются
+        count = 0
+        for kw in self._top:
+            if kw.sort_key() > key:
+                break
+            count += 1
+        released, self._top = self._top[:count], self._top[count:]
+        self.k -= count
+        return released
+
+
+def top_k(keywords: Iterable[KeywordRecord], k: int) -> List[KeywordRecord]:
+    ranking = TopK(k)
+    ranking.add(keywords)
+    return ranking.result()
+
+
+class StatsAccumulator:
+    def __init__(self, stop_words: Optional[Iterable[str]] = None):
+        self.count = 0
+        self.wsk_sum = 0
+        self.numwords_sum = 0
+        self.wsk_hist: Dict[int, int] = {}
+        self.numwords_hist: Dict[int, int] = {}
+        self.stop_words = 0
+        self._matcher = StopWordMatcher(stop_words)
+
+    def add(self, keywords: Iterable[KeywordRecord]):
+        wsk_hist = self.wsk_hist
+        numwords_hist = self.numwords_hist
+        search = self._matcher.search if self._matcher else None
+        count = wsk_sum = numwords_sum = stop_words = 0
+        for kw in keywords:
+            wsk = kw.wsk
+            numwords = kw.numwords
+            count += 1
+            wsk_sum += wsk
+            numwords_sum += numwords
+            wsk_hist[wsk] = wsk_hist.get(wsk, 0) + 1
+            numwords_hist[numwords] = numwords_hist.get(numwords, 0) + 1
+            if search is not None and search(kw.word.lower()):
+                stop_words += 1
+        self.count += count
+        self.wsk_sum += wsk_sum
+        self.numwords_sum += numwords_sum
+        self.stop_words += stop_words
+
+    @property
+    def mean_wsk(self) -> float:
+        return self.wsk_sum / self.count if self.count else 0.0
+
+    @property
+    def mean_numwords(self) -> float:
+        return self.numwords_sum / self.count if self.count else 0.0
+
+    def wsk_percentile(self, p: float) -> int:
+        return self._percentile(self.wsk_hist, p)
+
+    def numwords_percentile(self, p: float) -> int:
+        return self._percentile(self.numwords_hist, p)
+
+    def _percentile(self, hist: Dict[int, int], p: float) -> int:
+        if not self.count:
+            return 0
+        rank = max(1, -(-self.count * p // 100))
+        seen = 0
+        for value in sorted(hist):
+            seen += hist[value]
+            if seen >= rank:
+                return value
+        return max(hist)
+
+    def wsk_buckets(self, upper: int, bins: int = 5) -> List[Tuple[int, int, int]]:
+        width = max(1, -(-(upper + 1) // bins))
+        buckets = [0] * bins
+        overflow = 0
+        for value, count in self.wsk_hist.items():
+            index = value // width
+            if index < bins:
+                buckets[index] += count
+            else:
+                overflow += count
+        result = [(i * width, min(upper, (i + 1) * width - 1), count) for i, count in enumerate(buckets)]
+        if overflow:
+            result.append((bins * width, max(self.wsk_hist), overflow))
+        return result
+
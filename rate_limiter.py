@@ -1,30 +1,258 @@
+import os
+import json
 import time
+import asyncio
+import hashlib
+import tempfile
+import itertools
 from collections import deque
 from threading import Lock
+from typing import Dict, Optional
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
 
 
 class RateLimiter:
-    def __init__(self, max_requests: int = 10, time_window: int = 10):
+    # Блокирует ли _try_acquire поток (файловая блокировка), чтобы не выполнять его в цикле событий
+    BLOCKING = False
+
+    def __init__(self, max_requests: int = 10, time_window: int = 10,
+                 burst: Optional[int] = None, min_rate_factor: float = 0.2,
+                 recovery_step: float = 0.05):
         self.max_requests = max_requests
         self.time_window = time_window
+        self.capacity = max(1, min(burst or max_requests, max_requests))
+        self.nominal_rate = max_requests / time_window
+        self.min_rate = self.nominal_rate * min_rate_factor
+        self.recovery_step = self.nominal_rate * recovery_step
+        self.rate = self.nominal_rate
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
         self.requests = deque()
         self.lock = Lock()
 
-    def wait_if_needed(self):
+    def _refill(self, now: float):
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated = now
+
+    def _new_ticket(self) -> Optional[str]:
+        return None
+
+    def _release(self, ticket: Optional[str]):
+        pass
+
+    def _try_acquire(self, ticket: Optional[str] = None) -> float:
         with self.lock:
-            now = time.time()
-            
+            now = time.monotonic()
+            if now < self.paused_until:
+                return self.paused_until - now
+
             while self.requests and self.requests[0] <= now - self.time_window:
                 self.requests.popleft()
-            
             if len(self.requests) >= self.max_requests:
-                sleep_time = self.time_window - (now - self.requests[0])
-                if sleep_time > 0:
-                    time.sleep(sleep_time)
-                self.requests.popleft()
-            
-            self.requests.append(time.time())
+                return self.requests[0] + self.time_window - now
+
+            self._refill(now)
+            if self.tokens < 1:
+                return (1 - self.tokens) / self.rate
+
+            self.tokens -= 1
+            self.requests.append(now)
+            return 0.0
+
+    def acquire(self) -> float:
+        ticket = self._new_ticket()
+        waited = 0.0
+        acquired = False
+        try:
+            while True:
+                wait = self._try_acquire(ticket)
+                if wait <= 0:
+                    acquired = True
+                    return waited
+                time.sleep(wait)
+                waited += wait
+        finally:
+            if not acquired:
+                self._release(ticket)
+
+    async def acquire_async(self) -> float:
+        loop = asyncio.get_running_loop()
+        ticket = self._new_ticket()
+        waited = 0.0
+        acquired = False
+        try:
+            while True:
+                if self.BLOCKING:
+                    wait = await loop.run_in_executor(None, self._try_acquire, ticket)
+                else:
+                    wait = self._try_acquire(ticket)
+                if wait <= 0:
+                    acquired = True
+                    return waited
+                await asyncio.sleep(wait)
+                waited += wait
+        finally:
+            if not acquired:
+                if self.BLOCKING:
+                    await loop.run_in_executor(None, self._release, ticket)
+                else:
+                    self._release(ticket)
+
+    def wait_if_needed(self):
+        self.acquire()
+
+    def on_throttled(self, retry_after: float):
+        with self.lock:
+            now = time.monotonic()
+            self.paused_until = max(self.paused_until, now + retry_after)
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = 0.0
+            self.updated = self.paused_until
+
+    def on_success(self):
+        if self.rate >= self.nominal_rate:
+            return
+        with self.lock:
+            self.rate = min(self.nominal_rate, self.rate + self.recovery_step)
 
     def reset(self):
         with self.lock:
             self.requests.clear()
+            self.rate = self.nominal_rate
+            self.tokens = float(self.capacity)
+            self.updated = time.monotonic()
+            self.paused_until = 0.0
+
+
+class SharedRateLimiter(RateLimiter):
+    BLOCKING = True
+    WAITER_TIMEOUT = 5.0
+    POLL_INTERVAL = 0.05
+
+    def __init__(self, key: str, max_requests: int = 10, time_window: int = 10,
+                 burst: Optional[int] = None, directory: Optional[str] = None, **kwargs):
+        super().__init__(max_requests, time_window, burst=burst, **kwargs)
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+        self.path = os.path.join(directory or tempfile.gettempdir(), f"keyshunter_rate_{digest}.json")
+        self._tickets = itertools.count()
+
+    def _new_ticket(self) -> Optional[str]:
+        return f"{os.getpid()}-{next(self._tickets)}"
+
+    def _release(self, ticket: Optional[str]):
+        # Ожидающий ушел без слота (отмена или ошибка): иначе его запись считалась бы
+        # головой очереди во всех процессах до истечения WAITER_TIMEOUT
+        def update(ledger: Dict, now: float):
+            ledger["waiters"].pop(ticket, None)
+
+        self._update_ledger(update)
+
+    def _lock_file(self, f):
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+
+    def _unlock_file(self, f):
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _update_ledger(self, update):
+        with self.lock, open(self.path, "a+", encoding="utf-8") as f:
+            self._lock_file(f)
+            try:
+                f.seek(0)
+                try:
+                    ledger = json.loads(f.read() or "{}")
+                except ValueError:
+                    ledger = {}
+                now = time.time()
+                ledger.setdefault("requests", [])
+                ledger.setdefault("waiters", {})
+                ledger.setdefault("tokens", float(self.capacity))
+                ledger.setdefault("updated", now)
+                ledger.setdefault("paused_until", 0.0)
+                ledger.setdefault("rate", self.nominal_rate)
+
+                result = update(ledger, now)
+
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps(ledger))
+                f.flush()
+                return result
+            finally:
+                self._unlock_file(f)
+
+    def _try_acquire(self, ticket: Optional[str] = None) -> float:
+        def update(ledger: Dict, now: float) -> float:
+            waiters = ledger["waiters"]
+            for other, (_, heartbeat) in list(waiters.items()):
+                if now - heartbeat > self.WAITER_TIMEOUT:
+                    del waiters[other]
+            first_seen = waiters[ticket][0] if ticket in waiters else now
+            waiters[ticket] = [first_seen, now]
+
+            self.rate = ledger["rate"]
+            if now < ledger["paused_until"]:
+                return ledger["paused_until"] - now
+
+            head = min(waiters, key=lambda t: waiters[t][0])
+            if head != ticket:
+                return self.POLL_INTERVAL
+
+            ledger["requests"] = [t for t in ledger["requests"] if t > now - self.time_window]
+            if len(ledger["requests"]) >= self.max_requests:
+                return ledger["requests"][0] + self.time_window - now
+
+            elapsed = now - ledger["updated"]
+            if elapsed > 0:
+                ledger["tokens"] = min(self.capacity, ledger["tokens"] + elapsed * ledger["rate"])
+                ledger["updated"] = now
+            if ledger["tokens"] < 1:
+                return (1 - ledger["tokens"]) / ledger["rate"]
+
+            ledger["tokens"] -= 1
+            ledger["requests"].append(now)
+            del waiters[ticket]
+            return 0.0
+
+        return min(self._update_ledger(update), self.WAITER_TIMEOUT / 2)
+
+    def on_throttled(self, retry_after: float):
+        def update(ledger: Dict, now: float):
+            ledger["paused_until"] = max(ledger["paused_until"], now + retry_after)
+            ledger["rate"] = max(self.min_rate, ledger["rate"] / 2)
+            ledger["tokens"] = 0.0
+            ledger["updated"] = ledger["paused_until"]
+
+        self._update_ledger(update)
+
+    def on_success(self):
+        if self.rate >= self.nominal_rate:
+            return
+
+        def update(ledger: Dict, now: float):
+            ledger["rate"] = min(self.nominal_rate, ledger["rate"] + self.recovery_step)
+            self.rate = ledger["rate"]
+
+        self._update_ledger(update)
+
+    def reset(self):
+        def update(ledger: Dict, now: float):
+            ledger.clear()
+
+        self._update_ledger(update)
+        super().reset()
@@ -0,0 +1,155 @@
+import json
+import time
+import sqlite3
+import hashlib
+from threading import Lock
+from typing import Any, Dict, Optional
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        items = list(value)
+        if all(isinstance(item, str) for item in items):
+            return sorted({item.strip() for item in items})
+        return [_normalize(item) for item in items]
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+class ResponseCache:
+    def __init__(self, path: str = ".keyshunter_cache.sqlite", ttl: int = 86400,
+                 max_size_mb: int = 256, refresh: bool = False):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_size_mb * 1024 * 1024
+        self.refresh = refresh
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = Lock()
+
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, endpoint TEXT, value TEXT, "
+            "size INTEGER, created REAL, accessed REAL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed)")
+        self.conn.commit()
+        self.size = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    @staticmethod
+    def make_key(method: str, endpoint: str, params: Optional[Dict] = None,
+                 payload: Optional[Dict] = None, scope: str = "") -> str:
+        normalized = json.dumps({
+            "scope": scope,
+            "method": method.upper(),
+            "endpoint": endpoint,
+            "params": _normalize(params or {}),
+            "json": _normalize(payload or {})
+        }, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        if self.refresh:
+            self.misses += 1
+            return None
+
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT value, size, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            value, size, created = row
+            if now - created > self.ttl:
+                self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.conn.commit()
+                self.size -= size
+                self.misses += 1
+                return None
+
+            self.conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self.conn.commit()
+            self.hits += 1
+        return json.loads(value)
+
+    def set(self, key: str, endpoint: str, value: Any):
+        data = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+        size = len(data.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+
+        now = time.time()
+        with self.lock:
+            old = self.conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            if old:
+                self.size -= old[0]
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (key, endpoint, value, size, created, accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, endpoint, data, size, now, now)
+            )
+            self.size += size
+            self._evict()
+            self.conn.commit()
+
+    def invalidate(self, key: str):
+        with self.lock:
+            row = self.conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            if row:
+                self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.conn.commit()
+                self.size -= row[0]
+
+    def _evict(self):
+        if self.size <= self.max_bytes:
+            return
+
+        expired_before = time.time() - self.ttl
+        freed = self.conn.execute(
+            "SELECT COALESCE(SUM(size), 0), COUNT(*) FROM responses WHERE created < ?", (expired_before,)
+        ).fetchone()
+        if freed[1]:
+            self.conn.execute("DELETE FROM responses WHERE created < ?", (expired_before,))
+            self.size -= freed[0]
+            self.evictions += freed[1]
+
+        while self.size > self.max_bytes:
+            rows = self.conn.execute(
+                "SELECT key, size FROM responses ORDER BY accessed LIMIT 100"
+            ).fetchall()
+            if not rows:
+                self.size = 0
+                break
+            for key, size in rows:
+                self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.size -= size
+                self.evictions += 1
+                if self.size <= self.max_bytes:
+                    break
+
+    def clear(self):
+        with self.lock:
+            self.conn.execute("DELETE FROM responses")
+            self.conn.commit()
+            self.size = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size_bytes": self.size
+        }
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -1,5 +1,8 @@
 import re
-from typing import List, Set
+import json
+from itertools import chain, islice, product
+from string import Formatter
+from typing import Dict, Iterator, List, Optional, Tuple
 
 
 class SeedGenerator:
@@ -7,113 +10,165 @@ class SeedGenerator:
         "купить", "заказать", "цена", "стоимость", "прайс", "скидка", "акция",
         "в наличии", "доставка", "срочно", "сегодня", "ночью", "недорого"
     ]
-    
+
     LOCALIZATION = [
         "москва", "спб", "рядом", "около", "24/7", "круглосуточно",
         "с выездом", "на дом", "в офис"
     ]
-    
+
     CONSTRAINTS = [
         "недорого", "дешево", "срочно", "быстро", "ночью", "рассрочка",
         "гарантия", "возврат", "чек", "официально", "с документами"
     ]
-    
+
     QUESTIONS = [
         "как выбрать", "где купить", "сколько стоит", "какой лучше",
         "что лучше", "отличия", "сравнение", "обзор"
     ]
-    
+
     SEASONS = [
         "черная пятница", "новый год", "8 марта", "23 февраля",
         "день рождения", "праздник", "распродажа"
     ]
 
-    def __init__(self, niche: str, seed_targets: List[str] = None):
+    DIMENSIONS = {
+        "intent": "TRANSACTIONAL",
+        "location": "LOCALIZATION",
+        "constraint": "CONSTRAINTS",
+        "question": "QUESTIONS",
+        "season": "SEASONS"
+    }
+
+    # Шаблоны по числу модификаторов: сначала короткие фразы, затем все более длинные хвосты
+    PATTERNS = {
+        1: [
+            "{intent} {base}", "{base} {intent}", "{base} {location}", "{base} {constraint}",
+            "{question} {base}", "{base} {season}", "{base} на {season}"
+        ],
+        2: [
+            "{intent} {base} {location}", "{intent} {base} {constraint}", "{question} {base} {location}",
+            "{base} {constraint} {location}", "{intent} {base} на {season}", "{question} {base} {constraint}"
+        ],
+        3: [
+            "{intent} {base} {constraint} {location}", "{question} {base} {constraint} {location}",
+            "{intent} {base} {location} на {season}", "{intent} {base} {constraint} на {season}"
+        ],
+        4: [
+            "{intent} {base} {constraint} {location} на {season}"
+        ]
+    }
+
+    def __init__(self, niche: str, seed_targets: List[str] = None,
+                 modifiers: Optional[Dict[str, List[str]]] = None,
+                 fanout: Optional[int] = None, depth: int = 3):
         self.niche = niche.lower()
         self.seed_targets = seed_targets or []
-        self.generated_seeds = set()
+        self.fanout = fanout
+        self.depth = max(1, min(depth, max(self.PATTERNS)))
+        self.dimensions = self._build_dimensions(modifiers or {})
+
+    @classmethod
+    def from_config(cls, config) -> "SeedGenerator":
+        modifiers = cls.load_modifiers(config.seed_modifiers) if config.seed_modifiers else None
+        return cls(config.niche, config.seed_targets, modifiers=modifiers,
+                   fanout=config.seed_fanout, depth=config.seed_depth)
+
+    @classmethod
+    def load_modifiers(cls, path: str) -> Dict[str, List[str]]:
+        try:
+            with open(path, encoding="utf-8") as f:
+                modifiers = json.load(f)
+        except (OSError, ValueError) as e:
+            raise ValueError(f"❌ Не удалось прочитать словарь модификаторов {path}: {e}")
+        if not isinstance(modifiers, dict):
+            raise ValueError(f"❌ {path}: ожидается объект вида {{\"измерение\": [\"значение\", ...]}}")
+        unknown = set(modifiers) - set(cls.DIMENSIONS)
+        if unknown:
+            raise ValueError(f"❌ Неизвестные измерения в {path}: {', '.join(sorted(unknown))}. "
+                             f"Допустимы: {', '.join(cls.DIMENSIONS)}")
+        # Строка вместо списка разобралась бы на отдельные символы
+        invalid = [name for name, values in modifiers.items() if not isinstance(values, list)]
+        if invalid:
+            raise ValueError(f"❌ Значения измерений {', '.join(sorted(invalid))} в {path} должны быть списками")
+        return modifiers
+
+    def _build_dimensions(self, modifiers: Dict[str, List[str]]) -> Dict[str, List[Tuple[str, Tuple[str, ...]]]]:
+        dimensions = {}
+        for name, attribute in self.DIMENSIONS.items():
+            values = []
+            seen = set()
+            for value in list(modifiers.get(name, [])) + getattr(self, attribute):
+                value = " ".join(str(value).lower().split())
+                if value and value not in seen:
+                    seen.add(value)
+                    values.append((value, tuple(value.split())))
+            dimensions[name] = values[:self.fanout] if self.fanout else values
+        return dimensions
 
     def generate(self, count: int = 50) -> List[str]:
-        seeds = []
-        
-        if self.seed_targets:
-            seeds.extend(self.seed_targets[:count // 2])
-        
-        base_phrases = self._extract_base_phrases()
-        
-        for base in base_phrases[:5]:
-            seeds.extend(self._generate_transactional(base))
-            seeds.extend(self._generate_localized(base))
-            seeds.extend(self._generate_constrained(base))
-            seeds.extend(self._generate_questions(base))
-            seeds.extend(self._generate_seasonal(base))
-        
-        seeds = self._deduplicate(seeds)
-        seeds = self._filter_quality(seeds)
-        
-        return seeds[:count]
+        seeds = list(islice(self.iter_seeds(max_targets=count // 2), count))
+        if len(seeds) < count:
+            hints = ["SEED_MODIFIERS"] + (["SEED_DEPTH"] if self.depth < max(self.PATTERNS) else [])
+            print(f"⚠️ Шаблоны глубины {self.depth} дали только {len(seeds)} семян из SEED_COUNT={count}, "
+                  f"расширьте {' или '.join(hints)}")
+        return seeds
+
+    def iter_seeds(self, max_targets: Optional[int] = None) -> Iterator[str]:
+        targets = ((seed, tuple(seed.lower().split())) for seed in self.seed_targets[:max_targets])
+        seen = set()
+        for seed, words in chain(targets, self._iter_combinations()):
+            if len(words) < 2 or len(seed) < 10:
+                continue
+            key = tuple(sorted(words))
+            if key in seen:
+                continue
+            seen.add(key)
+            yield seed
+
+    def _iter_combinations(self) -> Iterator[Tuple[str, Tuple[str, ...]]]:
+        bases = [(base, tuple(base.split())) for base in self._extract_base_phrases()]
+        for depth in range(1, self.depth + 1):
+            streams = [
+                self._iter_pattern(pattern, base)
+                for pattern in self.PATTERNS[depth]
+                for base in bases
+            ]
+            yield from self._round_robin(streams)
+
+    def _iter_pattern(self, pattern: str, base: Tuple[str, Tuple[str, ...]]) -> Iterator[Tuple[str, Tuple[str, ...]]]:
+        fields = [field for _, field, _, _ in Formatter().parse(pattern) if field]
+        slots = [field for field in fields if field != "base"]
+        literal_words = tuple(Formatter().vformat(pattern, (), {field: "" for field in fields}).split())
+        for values in product(*(self.dimensions[slot] for slot in slots)):
+            texts = [text for text, _ in values]
+            if len(set(texts)) < len(texts):
+                continue
+            seed = pattern.format(base=base[0], **dict(zip(slots, texts)))
+            words = base[1] + literal_words
+            for _, value_words in values:
+                words += value_words
+            yield seed, words
+
+    @staticmethod
+    def _round_robin(streams: List[Iterator]) -> Iterator:
+        active = list(streams)
+        while active:
+            still_active = []
+            for stream in active:
+                item = next(stream, None)
+                if item is not None:
+                    yield item
+                    still_active.append(stream)
+            active = still_active
 
     def _extract_base_phrases(self) -> List[str]:
         words = re.findall(r'\b\w+\b', self.niche)
-        
+
         phrases = []
         if len(words) >= 2:
             phrases.append(' '.join(words[:2]))
         if len(words) >= 3:
             phrases.append(' '.join(words[:3]))
         phrases.append(' '.join(words))
-        
-        return phrases
-
-    def _generate_transactional(self, base: str) -> List[str]:
-        seeds = []
-        for intent in self.TRANSACTIONAL[:8]:
-            seeds.append(f"{intent} {base}")
-            seeds.append(f"{base} {intent}")
-        return seeds
 
-    def _generate_localized(self, base: str) -> List[str]:
-        seeds = []
-        for location in self.LOCALIZATION[:6]:
-            for intent in ["купить", "заказать", "доставка"]:
-                seeds.append(f"{intent} {base} {location}")
-        return seeds
-
-    def _generate_constrained(self, base: str) -> List[str]:
-        seeds = []
-        for constraint in self.CONSTRAINTS[:8]:
-            seeds.append(f"{base} {constraint}")
-            for intent in ["купить", "заказать"]:
-                seeds.append(f"{intent} {base} {constraint}")
-        return seeds
-
-    def _generate_questions(self, base: str) -> List[str]:
-        seeds = []
-        for question in self.QUESTIONS[:6]:
-            seeds.append(f"{question} {base}")
-        return seeds
-
-    def _generate_seasonal(self, base: str) -> List[str]:
-        seeds = []
-        for season in self.SEASONS[:5]:
-            seeds.append(f"{base} {season}")
-            seeds.append(f"{base} на {season}")
-        return seeds
-
-    def _deduplicate(self, seeds: List[str]) -> List[str]:
-        seen = set()
-        unique = []
-        for seed in seeds:
-            normalized = ' '.join(sorted(seed.lower().split()))
-            if normalized not in seen:
-                seen.add(normalized)
-                unique.append(seed)
-        return unique
-
-    def _filter_quality(self, seeds: List[str]) -> List[str]:
-        filtered = []
-        for seed in seeds:
-            words = seed.split()
-            if len(words) >= 2 and len(seed) >= 10:
-                filtered.append(seed)
-        return filtered
+        return list(dict.fromkeys(phrases))
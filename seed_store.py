@@ -0,0 +1,130 @@
+import json
+import time
+import sqlite3
+from collections import Counter, defaultdict
+from threading import Lock
+from typing import Dict, Iterable, List
+from keyword_record import KeywordRecord
+
+
+def attribute_suggestions(seeds: List[str], suggestions: Iterable[str]) -> Dict[str, List[str]]:
+    index = defaultdict(list)
+    for position, seed in enumerate(seeds):
+        for word in set(seed.lower().split()):
+            index[word].append(position)
+
+    attributed = {seed: [] for seed in seeds}
+    for suggestion in suggestions:
+        text = suggestion.lower()
+        overlap = Counter()
+        for word in set(text.split()):
+            overlap.update(index.get(word, ()))
+        if not overlap:
+            continue
+        best = max(overlap, key=lambda position: (
+            text.startswith(seeds[position].lower()), overlap[position], -position
+        ))
+        attributed[seeds[best]].append(suggestion)
+    return attributed
+
+
+class SeedStore:
+    BATCH = 500
+
+    def __init__(self, path: str = ".keyshunter_seeds.sqlite", ttl: int = 604800,
+                 refresh: bool = False):
+        self.path = path
+        self.ttl = ttl
+        self.refresh = refresh
+        self.hits = {"suggest": 0, "expand": 0}
+        self.misses = {"suggest": 0, "expand": 0}
+        self.lock = Lock()
+
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS suggestions ("
+            "seed TEXT, region INTEGER, keys TEXT, updated REAL, PRIMARY KEY (seed, region))"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS expansions ("
+            "phrase TEXT, base TEXT, filter TEXT, rows TEXT, updated REAL, PRIMARY KEY (phrase, base, filter))"
+        )
+        self.conn.commit()
+
+    @classmethod
+    def from_config(cls, config) -> "SeedStore":
+        return cls(config.seed_store_path, ttl=config.seed_store_ttl, refresh=config.cache_refresh)
+
+    def _select(self, kind: str, query: str, keys: List[str], params: tuple) -> Dict[str, str]:
+        if self.refresh:
+            self.misses[kind] += len(keys)
+            return {}
+
+        found = {}
+        oldest = time.time() - self.ttl
+        with self.lock:
+            for start in range(0, len(keys), self.BATCH):
+                batch = keys[start:start + self.BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = self.conn.execute(query.format(placeholders), (*batch, *params, oldest)).fetchall()
+                found.update(rows)
+        self.hits[kind] += len(found)
+        self.misses[kind] += len(keys) - len(found)
+        return found
+
+    def get_suggestions(self, seeds: List[str], region: int) -> Dict[str, List[str]]:
+        rows = self._select(
+            "suggest",
+            "SELECT seed, keys FROM suggestions WHERE seed IN ({}) AND region = ? AND updated >= ?",
+            list(dict.fromkeys(seeds)), (region,)
+        )
+        return {seed: json.loads(keys) for seed, keys in rows.items()}
+
+    def put_suggestions(self, suggestions: Dict[str, List[str]], region: int):
+        now = time.time()
+        with self.lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO suggestions (seed, region, keys, updated) VALUES (?, ?, ?, ?)",
+                [(seed, region, json.dumps(keys, ensure_ascii=False), now) for seed, keys in suggestions.items()]
+            )
+            self.conn.commit()
+
+    def get_expansions(self, phrases: List[str], base: str, filters: str) -> Dict[str, List[KeywordRecord]]:
+        rows = self._select(
+            "expand",
+            "SELECT phrase, rows FROM expansions WHERE phrase IN ({}) AND base = ? AND filter = ? AND updated >= ?",
+            list(dict.fromkeys(phrases)), (base, filters)
+        )
+        fields = KeywordRecord.FIELDS
+        return {
+            phrase: [
+                KeywordRecord(*values[:len(fields)], source_key=phrase,
+                              extra=values[len(fields)] if len(values) > len(fields) else None)
+                for values in json.loads(data)
+            ]
+            for phrase, data in rows.items()
+        }
+
+    def put_expansions(self, expansions: Dict[str, List[KeywordRecord]], base: str, filters: str):
+        now = time.time()
+        fields = KeywordRecord.FIELDS
+        with self.lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO expansions (phrase, base, filter, rows, updated) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (phrase, base, filters,
+                     json.dumps([[getattr(kw, field) for field in fields] + [kw.extra] for kw in records],
+                                ensure_ascii=False),
+                     now)
+                    for phrase, records in expansions.items()
+                ]
+            )
+            self.conn.commit()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {"hits": dict(self.hits), "misses": dict(self.misses)}
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
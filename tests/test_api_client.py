@@ -0,0 +1,38 @@
+from api_client import KeysAPIClient
+from response_cache import ResponseCache
+
+
+class _Response:
+    headers = {}
+
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+def _accepted_delays(client, max_retries):
+    return [client._handle_response(_Response(202), attempt, max_retries)[2] for attempt in range(max_retries)]
+
+
+def test_accepted_wait_keeps_total_budget():
+    client = KeysAPIClient("token")
+    delays = _accepted_delays(client, 3)
+    assert sum(delays) >= KeysAPIClient.ACCEPTED_WAIT
+    assert delays[-1] == 0
+
+
+def test_long_polls_grow_to_two_seconds():
+    delays = _accepted_delays(KeysAPIClient("token"), 30)
+    assert max(delays) == 2
+    assert delays[-1] == 0
+
+
+def test_cache_key_depends_on_server_and_token(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"))
+    request = ("POST", "/tools/suggest", {"json": {"list": ["ремонт"], "region": 213}})
+    keys = {
+        KeysAPIClient("token", cache=cache)._cache_key(*request),
+        KeysAPIClient("token", cache=cache, base_url="http://127.0.0.1:8765")._cache_key(*request),
+        KeysAPIClient("other", cache=cache)._cache_key(*request),
+    }
+    assert len(keys) == 3
+    assert KeysAPIClient("token", cache=cache)._cache_key(*request) in keys
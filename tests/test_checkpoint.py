@@ -0,0 +1,62 @@
+import pytest
+
+from checkpoint import RunCheckpoint
+from config import Config
+from keyword_record import KeywordRecord
+
+
+def test_resume_restores_stages_and_config(tmp_path):
+    checkpoint = RunCheckpoint(str(tmp_path))
+    checkpoint.save("seeds", ["ремонт квартир под ключ"])
+    checkpoint.save_config(Config(niche="ремонт квартир", wsk_threshold=40))
+
+    resumed = RunCheckpoint.resume(checkpoint.run_id, str(tmp_path))
+    assert resumed.get("seeds") == ["ремонт квартир под ключ"]
+    config = Config()
+    resumed.restore_config(config)
+    assert (config.niche, config.wsk_threshold) == ("ремонт квартир", 40)
+
+
+def test_resume_unknown_run_fails(tmp_path):
+    with pytest.raises(Exception):
+        RunCheckpoint.resume("missing", str(tmp_path))
+
+
+def test_saved_pages_survive_resume(tmp_path):
+    seeds = ["ремонт квартир", "ремонт домов"]
+    checkpoint = RunCheckpoint(str(tmp_path))
+    checkpoint.start_job(0, seeds, "uid-1")
+    checkpoint.save_page(0, 1, 3, [KeywordRecord("ремонт квартир цена", wsk=7, numwords=3)])
+
+    resumed = RunCheckpoint.resume(checkpoint.run_id, str(tmp_path))
+    job = resumed.job(0, seeds)
+    assert (job["uid"], job["pages"], job["last_page"], job["done"]) == ("uid-1", [1], 3, False)
+    page = resumed.load_page(0, 1)
+    assert [(kw.word, kw.wsk) for kw in page] == [("ремонт квартир цена", 7)]
+
+
+def test_job_is_ignored_when_keywords_change(tmp_path):
+    checkpoint = RunCheckpoint(str(tmp_path))
+    checkpoint.start_job(0, ["ремонт квартир"], "uid-1")
+    assert checkpoint.job(0, ["ремонт домов"]) == {}
+
+
+def test_results_replace_pages(tmp_path):
+    checkpoint = RunCheckpoint(str(tmp_path))
+    assert checkpoint.load_results() is None
+    checkpoint.start_job(0, ["ремонт квартир"], "uid-1")
+    checkpoint.save_page(0, 1, 1, [KeywordRecord("ремонт квартир цена", wsk=7)])
+    checkpoint.finish_job(0)
+    checkpoint.save_results([KeywordRecord("ремонт квартир цена", wsk=7)])
+
+    resumed = RunCheckpoint.resume(checkpoint.run_id, str(tmp_path))
+    assert [kw.word for kw in resumed.load_results()] == ["ремонт квартир цена"]
+    assert resumed.job(0, ["ремонт квартир"])["done"]
+
+
+def test_remove_deletes_run_directory(tmp_path):
+    checkpoint = RunCheckpoint(str(tmp_path))
+    checkpoint.start_job(0, ["ремонт квартир"], "uid-1")
+    checkpoint.save_page(0, 1, 1, [KeywordRecord("ремонт квартир цена", wsk=7)])
+    checkpoint.remove()
+    assert not (tmp_path / checkpoint.run_id).exists()
@@ -0,0 +1,41 @@
+from deduplicator import Deduplicator
+from keyword_record import KeywordRecord
+
+
+def test_key_ignores_word_order_case_and_yo():
+    dedup = Deduplicator()
+    assert dedup.key("Ремонт квартир Ёлки") == dedup.key("елки ремонт квартир")
+
+
+def test_stemming_merges_word_forms():
+    assert Deduplicator(stemming=True).key("ремонт квартиры") == Deduplicator(stemming=True).key("ремонт квартир")
+    assert Deduplicator().key("ремонт квартиры") != Deduplicator().key("ремонт квартир")
+
+
+def test_deduplicate_words_keeps_first_occurrence():
+    words = ["ремонт квартир", "квартир ремонт", "ремонт домов"]
+    assert Deduplicator().deduplicate_words(words) == ["ремонт квартир", "ремонт домов"]
+
+
+def test_deduplicate_keeps_higher_wsk_and_sort_order():
+    keywords = [
+        KeywordRecord("ремонт квартир цена", wsk=5, numwords=3),
+        KeywordRecord("ремонт домов цена", wsk=10, numwords=3),
+        KeywordRecord("цена ремонт квартир", wsk=20, numwords=3),
+    ]
+    result = Deduplicator().deduplicate(keywords)
+    assert [(kw.word, kw.wsk) for kw in result] == [("ремонт домов цена", 10), ("цена ремонт квартир", 20)]
+
+
+def test_compat_mode_keeps_first_occurrence():
+    keywords = [
+        KeywordRecord("ремонт квартир цена", wsk=5),
+        KeywordRecord("цена ремонт квартир", wsk=20),
+    ]
+    assert [kw.wsk for kw in Deduplicator(compat=True).deduplicate(keywords)] == [5]
+
+
+def test_unseen_remembers_keys_between_calls():
+    dedup = Deduplicator()
+    assert len(dedup.unseen([KeywordRecord("ремонт квартир"), KeywordRecord("квартир ремонт")])) == 1
+    assert dedup.unseen([KeywordRecord("ремонт квартир")]) == []
@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from delta import KeywordIndex
+from keyword_record import KeywordRecord
+
+
+def _records():
+    return [
+        KeywordRecord("ремонт квартир цена", wsk=10, ws=100),
+        KeywordRecord("ремонт домов цена", wsk=20, ws=200),
+    ]
+
+
+def test_index_round_trip(tmp_path):
+    index = KeywordIndex()
+    assert len(index.filter(_records())) == 2
+    path = str(tmp_path / "previous.kidx")
+    index.save(path)
+
+    loaded = KeywordIndex.load(path)
+    assert len(loaded) == 2
+    assert loaded.fields == ("wsk", "ws")
+    assert list(loaded.keys) == sorted(loaded.keys)
+
+
+def test_filter_counts_new_changed_and_unchanged(tmp_path):
+    path = str(tmp_path / "previous.kidx")
+    index = KeywordIndex()
+    index.filter(_records())
+    index.save(path)
+
+    loaded = KeywordIndex.load(path)
+    fresh = loaded.filter([
+        KeywordRecord("ремонт квартир цена", wsk=10, ws=100),
+        KeywordRecord("ремонт домов цена", wsk=25, ws=200),
+        KeywordRecord("ремонт офиса цена", wsk=5, ws=50),
+    ])
+    assert [kw.word for kw in fresh] == ["ремонт домов цена", "ремонт офиса цена"]
+    assert (loaded.new, loaded.changed, loaded.unchanged) == (1, 1, 1)
+
+    loaded.save(path)
+    assert len(KeywordIndex.load(path)) == 3
+
+
+def test_load_builds_index_from_export(tmp_path):
+    path = tmp_path / "previous.ndjson"
+    path.write_text("".join(json.dumps(kw.to_dict(), ensure_ascii=False) + "\n" for kw in _records()),
+                    encoding="utf-8")
+    index = KeywordIndex.load(str(path))
+    assert len(index) == 2
+    assert index.filter(_records()) == []
+
+
+def test_load_rejects_foreign_file(tmp_path):
+    path = tmp_path / "broken.kidx"
+    path.write_bytes(b"not an index\n")
+    with pytest.raises(ValueError):
+        KeywordIndex.load(str(path))
@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+from api_client import KeysAPIClient
+from async_api_client import AsyncKeysAPIClient
+from job_poller import JobPoller
+from rate_limiter import RateLimiter
+
+
+class _PendingListClient(AsyncKeysAPIClient):
+    def __init__(self, pending: int):
+        super().__init__(KeysAPIClient("token"), poller=JobPoller(RateLimiter(100, 1), min_interval=0.01))
+        self.pending = pending
+
+    async def get_keywords_by_list(self, uid, base, page=1, per_page=100, sort="wsk|desc", max_retries=3):
+        assert max_retries == 1
+        if self.pending:
+            self.pending -= 1
+            return None
+        return {"data": [{"word": "ремонт квартир"}], "last_page": 1}
+
+
+def test_job_finishes_when_state_is_ready():
+    states = iter([{"state": 0, "progress": 10}, {"state": 0, "progress": 60}, {"state": 10}])
+
+    async def probe():
+        return next(states)
+
+    async def run():
+        poller = JobPoller(RateLimiter(100, 1), min_interval=0.01)
+        assert await poller.wait("uid", probe) == {"state": 10}
+        return poller.polls
+
+    assert asyncio.run(run()) == 3
+
+
+def test_failed_job_raises():
+    async def probe():
+        return {"state": 2}
+
+    with pytest.raises(Exception, match="Ошибка обработки"):
+        asyncio.run(JobPoller(RateLimiter(100, 1), min_interval=0.01).wait("uid", probe))
+
+
+def test_keywords_by_list_is_polled_through_the_poller():
+    client = _PendingListClient(pending=2)
+    try:
+        page = asyncio.run(client.wait_for_keywords_by_list("msk:44:abc", "msk", max_wait=5))
+    finally:
+        client.close()
+    assert page["data"] == [{"word": "ремонт квартир"}]
+    assert client.poller.polls == 3
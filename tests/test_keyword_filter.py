@@ -0,0 +1,84 @@
+from config import Config
+from keyword_filter import FilterExpression, KeywordFilter, Predicate
+from keyword_record import KeywordRecord
+
+
+def test_predicate_parses_numeric_and_text_values():
+    numeric = Predicate.parse("adscnt>=2")
+    assert (numeric.field, numeric.op, numeric.value) == ("adscnt", ">=", 2)
+
+    text = Predicate.parse("destination_key NOT LIKE отзывы")
+    assert (text.field, text.op, text.value) == ("destination_key", "NOT LIKE", "отзывы")
+
+
+def test_unknown_clause_is_passed_to_server_verbatim():
+    predicate = Predicate.parse("some_new_field~~42")
+    assert predicate.op is None
+    assert predicate.compile() is None
+    assert predicate.to_server() == "some_new_field~~42"
+
+
+def test_expression_round_trips_to_server_string():
+    text = "adscnt>=2^avbid>10^destination_keyLIKEремонт"
+    assert FilterExpression.parse(text).server() == text
+    assert FilterExpression.parse("adscnt >= 2").server() == "adscnt>=2"
+    assert FilterExpression.parse("").server() == ""
+    assert FilterExpression.parse(None).predicates == []
+
+
+def test_mirror_applies_compiled_predicates():
+    mirror = FilterExpression.parse("wsk<=50^destination_key NOT LIKE скачать").mirror()
+    assert mirror(KeywordRecord("ремонт квартир цена", wsk=10))
+    assert not mirror(KeywordRecord("ремонт квартир цена", wsk=51))
+    assert not mirror(KeywordRecord("скачать ремонт квартир", wsk=10))
+
+
+def test_from_config_pushes_thresholds_to_server():
+    config = Config(stop_words=["видео"], ad_filters="adscnt>=2")
+    server = FilterExpression.from_config(config).server()
+    assert server == "numwords>=3^wsk<=80^ws<=1000^destination_keyNOT LIKEвидео^isadult=0^adscnt>=2"
+
+
+def test_local_thresholds_stay_out_of_server_string():
+    config = Config(stop_words=["видео"], ad_filters="adscnt>=2")
+    expression = FilterExpression.from_config(config, local_thresholds=True)
+    assert expression.server() == "ws<=1000^isadult=0^adscnt>=2"
+
+    local = expression.local()
+    assert local.min_num_words == 3
+    assert local.wsk_threshold == 80
+    assert local.stop_words
+
+
+def test_pushdown_expression_leaves_only_validity_checks_locally():
+    local = FilterExpression.from_config(Config(stop_words=["видео"])).local()
+    assert local.min_num_words is None
+    assert local.wsk_threshold is None
+    assert not local.stop_words
+
+
+def test_keyword_filter_matches_and_filter_agree():
+    keyword_filter = KeywordFilter(3, 80, ["видео"])
+    keywords = [
+        KeywordRecord("ремонт квартир под ключ", wsk=5, numwords=4),
+        KeywordRecord("ремонт квартир", wsk=5, numwords=2),
+        KeywordRecord("ремонт квартир дорого", wsk=81, numwords=3),
+        KeywordRecord("ремонт квартир видео", wsk=5, numwords=3),
+        KeywordRecord("ремонт квартир <script>", wsk=5, numwords=3),
+        KeywordRecord("ремонт ремонт ремонт ремонт", wsk=5, numwords=4),
+    ]
+    assert [kw.word for kw in keyword_filter.filter(keywords)] == ["ремонт квартир под ключ"]
+    assert [kw for kw in keywords if keyword_filter.matches(kw)] == keyword_filter.filter(keywords)
+
+
+def test_many_stop_words_use_automaton():
+    stop_words = [f"слово{i}" for i in range(40)] + ["видео"]
+    keyword_filter = KeywordFilter(1, 100, stop_words)
+    assert keyword_filter.stop_words._delta is not None
+    assert not keyword_filter.matches(KeywordRecord("ремонт квартир видео", wsk=5, numwords=3))
+    assert keyword_filter.matches(KeywordRecord("ремонт квартир цена", wsk=5, numwords=3))
+
+
+def test_keyword_filter_from_config_uses_local_thresholds():
+    keyword_filter = KeywordFilter.from_config(Config(min_num_words=2, wsk_threshold=40, stop_words=[]))
+    assert (keyword_filter.min_num_words, keyword_filter.wsk_threshold) == (2, 40)
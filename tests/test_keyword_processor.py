@@ -0,0 +1,51 @@
+import asyncio
+
+from api_client import KeysAPIClient
+from async_api_client import AsyncKeysAPIClient
+from config import Config
+from keyword_processor import KeywordProcessor
+from keyword_record import KeywordRecord
+
+
+def test_close_shuts_down_own_executor():
+    processor = KeywordProcessor(KeysAPIClient("token"), Config())
+    processor.close()
+    assert processor.async_api.executor._shutdown
+
+
+def test_close_leaves_shared_client_open():
+    api = KeysAPIClient("token")
+    shared = AsyncKeysAPIClient(api)
+    KeywordProcessor(api, Config(), async_client=shared).close()
+    assert not shared.executor._shutdown
+    shared.close()
+
+
+class _StreamingProcessor(KeywordProcessor):
+    PAGES = {
+        1: [[0, 2, 4], [6, 8, 10]],
+        2: [[1, 3, 5], [7, 9, 11]],
+    }
+
+    async def _collect_keywords(self, seeds):
+        return ["ремонт квартир", "ремонт домов"]
+
+    async def _stream_extended_chunk(self, index, keywords, queue):
+        for page in self.PAGES[index]:
+            # Второе задание отстает, но его строки не должны проиграть более поздним строкам первого
+            await asyncio.sleep(0.01 if index == 1 else 0.05)
+            await queue.put((index, [KeywordRecord(f"ремонт задание{index} вариант{wsk}", wsk=wsk, numwords=4) for wsk in page]))
+
+
+def test_stream_emits_global_top_in_sort_order():
+    config = Config(extended_chunk_size=1, max_results=5, min_num_words=1, stop_words=[], dedup_mode="local")
+    processor = _StreamingProcessor(KeysAPIClient("token"), config)
+
+    async def run():
+        return [batch async for batch in processor.stream_pipeline(["ремонт"])]
+
+    try:
+        batches = asyncio.run(run())
+    finally:
+        processor.close()
+    assert [kw.wsk for batch in batches for kw in batch] == [0, 1, 2, 3, 4]
@@ -0,0 +1,33 @@
+from keyword_record import KeywordRecord
+from seed_store import SeedStore
+
+
+ROW = {
+    "source_key": "ремонт квартир",
+    "destination_key": "ремонт квартир под ключ",
+    "ws": 120, "wsk": 15, "numwords": 4, "frequency": 300, "maxcpc": 41.5, "addition": 1,
+}
+
+
+def test_from_api_keeps_unknown_fields_in_extra():
+    kw = KeywordRecord.from_api(ROW)
+    assert (kw.word, kw.wsk, kw.source_key) == ("ремонт квартир под ключ", 15, "ремонт квартир")
+    assert kw.extra == {"frequency": 300, "maxcpc": 41.5, "addition": 1}
+    assert KeywordRecord.from_api({"destination_key": "ремонт", "wsk": 1}).extra is None
+
+
+def test_to_dict_round_trips_extra_fields():
+    data = KeywordRecord.from_api(ROW).to_dict()
+    assert data["frequency"] == 300 and data["maxcpc"] == 41.5
+    assert "destination_key" not in data
+    assert KeywordRecord.from_api(data).to_dict() == data
+
+
+def test_seed_store_keeps_extra_fields(tmp_path):
+    store = SeedStore(str(tmp_path / "seeds.sqlite"))
+    try:
+        store.put_expansions({"ремонт квартир": [KeywordRecord.from_api(ROW)]}, "msk", "")
+        [kw] = store.get_expansions(["ремонт квартир"], "msk", "")["ремонт квартир"]
+    finally:
+        store.close()
+    assert kw.extra == {"frequency": 300, "maxcpc": 41.5, "addition": 1}
@@ -0,0 +1,24 @@
+from metrics import Metrics, endpoint_label
+
+
+def test_endpoint_label_replaces_hex_uid():
+    assert endpoint_label("/tools/extended_keywords/7d9a401359df946e37cbebfc937a5d65") == \
+        "/tools/extended_keywords/{uid}"
+    assert endpoint_label("/tools/extended_keywords/state/7d9a401359df946e37cbebfc937a5d65") == \
+        "/tools/extended_keywords/state/{uid}"
+
+
+def test_endpoint_label_replaces_region_uid():
+    assert endpoint_label("/tools/keywords_by_list/msk:44:6684baecf18566c4381fc7731925481d") == \
+        "/tools/keywords_by_list/{uid}"
+
+
+def test_endpoint_label_keeps_plain_paths():
+    assert endpoint_label("/report/simple/keyword_dashboard") == "/report/simple/keyword_dashboard"
+
+
+def test_validation_jobs_share_one_label():
+    metrics = Metrics()
+    for uid in ("msk:44:6684baecf18566c4381fc7731925481d", "spb:2:0123456789abcdef0123456789abcdef"):
+        metrics.observe_request(f"/tools/keywords_by_list/{uid}", 200, 0.1, 10)
+    assert list(metrics.summary()["endpoints"]) == ["/tools/keywords_by_list/{uid}"]
@@ -0,0 +1,19 @@
+from keyword_record import KeywordRecord
+from ranking import TopK, top_k
+
+
+def _records(*wsk):
+    return [KeywordRecord(f"ремонт квартир {value}", wsk=value, numwords=3) for value in wsk]
+
+
+def test_top_k_keeps_smallest_sort_keys():
+    assert [kw.wsk for kw in top_k(_records(7, 3, 9, 1), 2)] == [1, 3]
+
+
+def test_pop_until_releases_rows_and_shrinks_capacity():
+    ranking = TopK(3)
+    ranking.add(_records(5, 1, 8, 3))
+    assert [kw.wsk for kw in ranking.pop_until((3, 0))] == [1, 3]
+    assert ranking.k == 1
+    ranking.add(_records(2, 4))
+    assert [kw.wsk for kw in ranking.result()] == [2]
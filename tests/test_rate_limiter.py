@@ -0,0 +1,70 @@
+import json
+import asyncio
+
+import pytest
+
+from rate_limiter import RateLimiter, SharedRateLimiter
+
+
+def test_burst_is_served_without_waiting():
+    limiter = RateLimiter(max_requests=5, time_window=10)
+    assert [limiter._try_acquire() for _ in range(5)] == [0.0] * 5
+    assert limiter._try_acquire() > 0
+
+
+def test_window_caps_requests_even_with_tokens():
+    limiter = RateLimiter(max_requests=2, time_window=10)
+    limiter._try_acquire()
+    limiter._try_acquire()
+    limiter.tokens = float(limiter.capacity)
+    assert limiter._try_acquire() == pytest.approx(10, abs=0.1)
+
+
+def test_throttling_halves_rate_and_success_restores_it():
+    limiter = RateLimiter(max_requests=10, time_window=10)
+    limiter.on_throttled(1)
+    assert limiter.rate == pytest.approx(0.5)
+    assert limiter._try_acquire() == pytest.approx(1, abs=0.1)
+    for _ in range(20):
+        limiter.on_success()
+    assert limiter.rate == limiter.nominal_rate
+
+
+def test_rate_never_drops_below_minimum():
+    limiter = RateLimiter(max_requests=10, time_window=10, min_rate_factor=0.2)
+    for _ in range(10):
+        limiter.on_throttled(0)
+    assert limiter.rate == pytest.approx(0.2)
+
+
+def test_reset_restores_full_bucket():
+    limiter = RateLimiter(max_requests=2, time_window=10)
+    limiter.on_throttled(30)
+    limiter.reset()
+    assert limiter._try_acquire() == 0.0
+
+
+def test_shared_limiters_share_one_budget(tmp_path):
+    first = SharedRateLimiter("token", max_requests=2, time_window=10, directory=str(tmp_path))
+    second = SharedRateLimiter("token", max_requests=2, time_window=10, directory=str(tmp_path))
+    assert first.acquire() == 0.0
+    assert second.acquire() == 0.0
+    assert first._try_acquire(first._new_ticket()) > 0
+
+
+def test_cancelled_waiter_releases_its_ticket(tmp_path):
+    limiter = SharedRateLimiter("token", max_requests=1, time_window=10, directory=str(tmp_path))
+
+    async def run():
+        limiter.acquire()
+        waiter = asyncio.ensure_future(limiter.acquire_async())
+        await asyncio.sleep(0.2)
+        with open(limiter.path, encoding="utf-8") as f:
+            assert json.load(f)["waiters"]
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+    asyncio.run(run())
+    with open(limiter.path, encoding="utf-8") as f:
+        assert json.load(f)["waiters"] == {}
@@ -0,0 +1,39 @@
+import json
+
+import pytest
+
+from config import Config
+from seed_generator import SeedGenerator
+
+
+def test_generate_is_deterministic_and_unique():
+    seeds = SeedGenerator("ремонт квартир").generate(50)
+    assert seeds == SeedGenerator("ремонт квартир").generate(50)
+    assert len(seeds) == len({tuple(sorted(seed.split())) for seed in seeds}) == 50
+
+
+def test_shortfall_is_reported(capsys):
+    seeds = SeedGenerator("ремонт квартир", depth=1, fanout=1).generate(1000)
+    assert len(seeds) < 1000
+    assert f"только {len(seeds)} семян из SEED_COUNT=1000" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("fanout", [0, -2])
+def test_config_rejects_non_positive_fanout(fanout):
+    with pytest.raises(ValueError, match="SEED_FANOUT"):
+        Config(api_token="token", niche="ремонт квартир", seed_fanout=fanout).validate()
+
+
+def test_modifiers_must_be_lists(tmp_path):
+    path = tmp_path / "modifiers.json"
+    path.write_text(json.dumps({"location": "москва"}, ensure_ascii=False), encoding="utf-8")
+    with pytest.raises(ValueError, match="location"):
+        SeedGenerator.load_modifiers(str(path))
+
+
+def test_modifiers_extend_dimensions(tmp_path):
+    path = tmp_path / "modifiers.json"
+    path.write_text(json.dumps({"location": ["в казани"]}, ensure_ascii=False), encoding="utf-8")
+    modifiers = SeedGenerator.load_modifiers(str(path))
+    seeds = SeedGenerator("ремонт квартир", modifiers=modifiers, depth=1).generate(500)
+    assert any("в казани" in seed for seed in seeds)
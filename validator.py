@@ -0,0 +1,119 @@
+import asyncio
+from datetime import date, datetime
+from statistics import median_low
+from typing import Dict, List, Optional
+from api_client import KeysAPIClient
+from async_api_client import AsyncKeysAPIClient
+from keyword_record import KeywordRecord
+
+
+def freshness(serpf: Optional[str], today: Optional[date] = None) -> Optional[int]:
+    try:
+        checked = datetime.strptime(str(serpf), "%d.%m.%Y").date()
+    except ValueError:
+        return None
+    return ((today or date.today()) - checked).days
+
+
+class KeywordValidator:
+    def __init__(self, async_client: AsyncKeysAPIClient, base: str, fallback_limit: int = 5,
+                 timeout: Optional[float] = None):
+        self.async_api = async_client
+        self.base = base
+        self.timeout = timeout
+        # Каждый запрос к дашборду тратит слот лимита API, поэтому проверяем им только часть пропусков
+        self.fallback_limit = fallback_limit
+
+    async def validate(self, keywords: List[KeywordRecord]) -> Dict:
+        expected = {}
+        for kw in keywords:
+            expected.setdefault(kw.word.lower(), kw)
+
+        found = None
+        try:
+            found = await self._check_list(list(expected))
+        except Exception as e:
+            print(f"   ⚠ Массовая проверка недоступна: {e}")
+
+        missing = [word for word in expected if not found or word not in found]
+        checked = set(missing[:self.fallback_limit])
+        fallback = await self._check_dashboard(list(checked)) if checked else {}
+
+        today = date.today()
+        rows = []
+        for word, kw in expected.items():
+            row = found.get(word) if found else None
+            source = "list"
+            if row is None:
+                row = fallback.get(word)
+                source = "dashboard" if row is not None else None
+            serpf = row.get("serpf") if row else None
+            verified = found is not None or word in checked
+            rows.append({
+                "word": kw.word,
+                "found": row is not None if verified else None,
+                "source": source,
+                "wsk": kw.wsk,
+                "wsk_now": row.get("wsk") if row else None,
+                "ws_now": row.get("ws") if row else None,
+                "serpf": serpf,
+                "age_days": freshness(serpf, today) if serpf else None
+            })
+        return self._summary(rows)
+
+    async def _check_list(self, words: List[str]) -> Optional[Dict[str, Dict]]:
+        uid = await self.async_api.create_keywords_by_list(self.base, words, use_cache=False)
+        if not uid:
+            return None
+
+        per_page = KeysAPIClient.MAX_PER_PAGE
+        first = await self.async_api.wait_for_keywords_by_list(uid, self.base, per_page, self.timeout)
+        if not first:
+            return None
+        pages = [first]
+        last_page = int(first.get("last_page") or 1)
+        if last_page > 1:
+            pages += await asyncio.gather(*(
+                self.async_api.get_keywords_by_list(uid, self.base, page=page, per_page=per_page)
+                for page in range(2, last_page + 1)
+            ))
+        if not all(pages):
+            return None
+
+        return {
+            str(row.get("word", "")).lower(): row
+            for page in pages
+            for row in page.get("data", [])
+        }
+
+    async def _check_dashboard(self, words: List[str]) -> Dict[str, Dict]:
+        async def fetch(word: str):
+            try:
+                return word, await self.async_api.get_keyword_dashboard(self.base, word)
+            except Exception as e:
+                print(f"   ⚠ '{word}': {e}")
+                return word, None
+
+        results = await asyncio.gather(*(fetch(word) for word in words))
+        return {word: dashboard for word, dashboard in results if dashboard}
+
+    @staticmethod
+    def _summary(rows: List[Dict]) -> Dict:
+        verified = [row for row in rows if row["found"] is not None]
+        found = [row for row in verified if row["found"]]
+        ages = [row["age_days"] for row in found if row["age_days"] is not None]
+        return {
+            "checked": len(verified),
+            "unverified": len(rows) - len(verified),
+            "found": len(found),
+            "coverage": round(len(found) / len(verified), 4) if verified else 0.0,
+            "from_list": sum(1 for row in found if row["source"] == "list"),
+            "from_dashboard": sum(1 for row in found if row["source"] == "dashboard"),
+            "changed_wsk": sum(1 for row in found if row["wsk_now"] is not None and row["wsk_now"] != row["wsk"]),
+            "freshness": {
+                "dated": len(ages),
+                "median_days": median_low(ages) if ages else None,
+                "max_days": max(ages) if ages else None
+            },
+            "keywords": rows
+        }